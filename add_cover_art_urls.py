@@ -1,30 +1,303 @@
-﻿import json
-import requests
+﻿import os
+import mmap
+import base64
+import orjson
 import time
+import asyncio
+import httpx
+import ijson
+import shutil
+import logging
+from itertools import islice
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from dotenv import load_dotenv
 
-def get_spotify_image_url(track_id):
-    url = f"https://open.spotify.com/oembed?url=spotify:track:{track_id}"
-    response = requests.get(url)
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
+SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
+
+MAX_CONCURRENT_REQUESTS = 10
+CONNECTION_LIMIT = 20
+TRACKS_BATCH_SIZE = 50  # Maximum IDs accepted by GET /v1/tracks
+JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+# HTTP session settings
+REQUEST_TIMEOUT = 5  # Seconds per request
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.3  # Seconds, doubled on each retry
+RETRY_STATUSES = {500, 502, 503, 504}
+RATE_LIMIT = 30  # Requests per second (burst capacity and refill rate)
+_EMPTY_META = {}  # shared read-only default for songs without metadata
+
+class TokenBucket:
+    """Async token bucket: allows bursts up to capacity, refills at rate tokens/second"""
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+    
+    async def pause(self, seconds: float):
+        """Drain the bucket for the given time, e.g. when the server returns Retry-After"""
+        async with self.lock:
+            self.tokens = 0
+            self.updated_at = time.monotonic() + seconds
+
+async def get_spotify_token(client):
+    """Get an app access token via the Client Credentials flow (None if not configured)"""
+    if not SPOTIFY_CLIENT_ID or not SPOTIFY_CLIENT_SECRET:
+        return None
     
+    credentials = base64.b64encode(f"{SPOTIFY_CLIENT_ID}:{SPOTIFY_CLIENT_SECRET}".encode()).decode()
+    response = await client.post(
+        "https://accounts.spotify.com/api/token",
+        data={"grant_type": "client_credentials"},
+        headers={"Authorization": f"Basic {credentials}"}
+    )
     if response.status_code != 200:
-        raise Exception(f"Error: {response.status_code} - {response.text}")
+        raise Exception(f"Token error: {response.status_code} - {response.text}")
     
-    data = response.json()
+    return orjson.loads(response.content)["access_token"]
+
+def parse_retry_after(value, default):
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP-date form)"""
+    if value is None:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+async def get_json(client, limiter, url, **kwargs):
+    """GET a JSON document on the shared HTTP/2 client, retrying transient failures"""
+    for attempt in range(MAX_RETRIES + 1):
+        await limiter.acquire()
+        try:
+            response = await client.get(url, **kwargs)
+        except httpx.TransportError:
+            if attempt == MAX_RETRIES:
+                raise
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+            continue
+        
+        if response.status_code == 429 and attempt < MAX_RETRIES:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'), RETRY_BACKOFF * 2 ** attempt)
+            await limiter.pause(retry_after)
+            continue
+        
+        if response.status_code in RETRY_STATUSES and attempt < MAX_RETRIES:
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+            continue
+        
+        if response.status_code != 200:
+            raise Exception(f"Error: {response.status_code} - {response.text}")
+        
+        return orjson.loads(response.content)
+
+async def fetch_cover(client, semaphore, limiter, track_id):
+    url = f"https://open.spotify.com/oembed?url=spotify:track:{track_id}"
+    async with semaphore:
+        data = await get_json(client, limiter, url)
     return data["thumbnail_url"]
 
+async def get_covers_batch(client, semaphore, limiter, token, track_ids):
+    """Fetch album cover URLs for up to 50 tracks in a single Web API call"""
+    url = f"https://api.spotify.com/v1/tracks?ids={','.join(track_ids[:TRACKS_BATCH_SIZE])}"
+    async with semaphore:
+        data = await get_json(client, limiter, url, headers={"Authorization": f"Bearer {token}"})
+    
+    covers = {}
+    for track in data.get("tracks", []):
+        if not track:
+            continue
+        images = track.get("album", {}).get("images", [])
+        if images:
+            covers[track["id"]] = images[0]["url"]
+    return covers
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+async def run_all(track_ids, on_cover=None, progress=None):
+    """
+    Fetch cover URLs for all track IDs concurrently, bounded by a semaphore.
+    Uses the batched Web API when credentials are configured, oEmbed otherwise.
+    on_cover(track_id, url) is called as soon as each cover is resolved,
+    progress.update(n) (e.g. a tqdm bar) as track lookups finish.
+    Returns dict: track_id -> cover URL or Exception
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    limiter = TokenBucket(RATE_LIMIT, RATE_LIMIT)
+    # With HTTP/2 all concurrent requests to an origin are multiplexed on one connection
+    limits = httpx.Limits(max_connections=CONNECTION_LIMIT, max_keepalive_connections=CONNECTION_LIMIT)
+    
+    async def fetch_one(client, track_id):
+        try:
+            url = await fetch_cover(client, semaphore, limiter, track_id)
+        finally:
+            if progress:
+                progress.update(1)
+        if on_cover:
+            on_cover(track_id, url)
+        return url
+    
+    async def fetch_batch(client, token, batch):
+        try:
+            covers = await get_covers_batch(client, semaphore, limiter, token, batch)
+        finally:
+            if progress:
+                progress.update(len(batch))
+        if on_cover:
+            for track_id, url in covers.items():
+                on_cover(track_id, url)
+        return covers
+    
+    async with httpx.AsyncClient(http2=True, limits=limits, timeout=REQUEST_TIMEOUT) as client:
+        token = await get_spotify_token(client)
+        
+        if not token:
+            tasks = [fetch_one(client, track_id) for track_id in track_ids]
+            return dict(zip(track_ids, await asyncio.gather(*tasks, return_exceptions=True)))
+        
+        batches = list(chunked(track_ids, TRACKS_BATCH_SIZE))
+        tasks = [fetch_batch(client, token, batch) for batch in batches]
+        batch_results = await asyncio.gather(*tasks, return_exceptions=True)
+    
+    results = {}
+    for batch, covers in zip(batches, batch_results):
+        for track_id in batch:
+            if isinstance(covers, Exception):
+                results[track_id] = covers
+            elif track_id in covers:
+                results[track_id] = covers[track_id]
+            else:
+                results[track_id] = Exception("No album image returned")
+    return results
+
 def extract_track_id_from_uri(track_uri):
     if track_uri and track_uri.startswith("spotify:track:"):
         return track_uri.replace("spotify:track:", "")
     return None
 
+def append_journal(journal, lines):
+    journal.write(lines)
+    journal.flush()
+
+def replay_journal(journal_path):
+    """Read the cover update journal into a dict: song_id -> metadata patch"""
+    updates = {}
+    if journal_path.exists():
+        with open(journal_path, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = orjson.loads(line)
+                updates[entry['id']] = {
+                    'cover_art_url': entry['url'],
+                    'cover_art_updated_at': entry['ts']
+                }
+    return updates
+
+def scan(songs):
+    """Single pass over (song_id, song_data) pairs, yielding whether each song has cover art"""
+    for song_id, song_data in songs:
+        cover_art_url = (song_data.get('metadata') or _EMPTY_META).get('cover_art_url', '').strip()
+        yield song_id, song_data, bool(cover_art_url)
+
+def load_done_ids(journal_path):
+    """Song IDs whose covers were already fetched by a previous (interrupted) run"""
+    if not journal_path.exists():
+        return set()
+    with open(journal_path, 'rb') as f:
+        return {orjson.loads(line)['id'] for line in f if line.strip()}
+
+def create_backup(songs_db_path, backup_path):
+    """
+    Hardlink the current database as the backup (no data copied). The database is
+    only ever replaced via os.replace, so the link keeps pointing at the old contents.
+    """
+    if backup_path.exists():
+        backup_path.unlink()
+    try:
+        os.link(songs_db_path, backup_path)
+    except OSError:
+        # Filesystem without hardlink support
+        shutil.copy2(songs_db_path, backup_path)
+
+def write_database_streaming(songs_db_path, updates, summary):
+    """
+    Rewrite the songs database applying metadata patches, streaming one song at a time.
+    updates: dict song_id -> metadata patch
+    """
+    tmp_path = songs_db_path.with_suffix('.json.tmp')
+    total_songs = 0
+    
+    with open(songs_db_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as src, \
+            open(tmp_path, 'wb') as dst:
+        dst.write(b'{\n  "songs": {')
+        for song_id, song_data in ijson.kvitems(src, 'songs', use_float=True):
+            patch = updates.get(song_id)
+            if patch:
+                song_data.setdefault('metadata', {}).update(patch)
+            
+            song_json = orjson.dumps(song_data, option=JSON_OPTIONS).replace(b'\n', b'\n    ')
+            dst.write(b'%s\n    %s: %s' % (b',' if total_songs else b'', orjson.dumps(song_id), song_json))
+            total_songs += 1
+        
+        dst.write(b'\n  },\n')
+        tail = {
+            'total_songs': total_songs,
+            'last_updated': datetime.now().isoformat(),
+            'cover_art_update_summary': summary
+        }
+        dst.write(orjson.dumps(tail, option=JSON_OPTIONS)[2:])
+    
+    os.replace(tmp_path, songs_db_path)
+
 def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    
     print(" Cover Art URL Updater")
     print("=" * 50)
     
     metadata_folder = Path("consolidated_music/metadata")
     songs_db_path = metadata_folder / "songs_database.json"
+    journal_path = metadata_folder / "cover_art_updates.jsonl"
     
     if not songs_db_path.exists():
         print(f" Songs database not found at: {songs_db_path}")
@@ -32,36 +305,47 @@ def main():
     
     print(f" Loading songs database...")
     
-    with open(songs_db_path, 'r', encoding='utf-8') as f:
-        database = json.load(f)
+    total_songs = 0
+    songs_without_cover = []
     
-    songs_dict = database.get('songs', {})
-    total_songs = len(songs_dict)
+    # Memory-mapped so the OS pages the file in on demand
+    with open(songs_db_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for song_id, song_data, has_cover in scan(ijson.kvitems(mm, 'songs', use_float=True)):
+            total_songs += 1
+            if not has_cover:
+                songs_without_cover.append((song_id, song_data))
     
-    print(f" Total songs in database: {total_songs}")
+    songs_with_cover = total_songs - len(songs_without_cover)
     
-    songs_without_cover = []
-    songs_with_cover = 0
-    
-    for song_id, song_data in songs_dict.items():
-        metadata = song_data.get('metadata', {})
-        cover_art_url = metadata.get('cover_art_url', '').strip()
-        
-        if not cover_art_url:
-            songs_without_cover.append((song_id, song_data))
-        else:
-            songs_with_cover += 1
+    done_ids = load_done_ids(journal_path)
+    if done_ids:
+        songs_without_cover = [(i, s) for i, s in songs_without_cover if i not in done_ids]
     
+    print(f" Total songs in database: {total_songs}")
     print(f" Songs with cover art: {songs_with_cover}")
     print(f" Songs without cover art: {len(songs_without_cover)}")
+    if done_ids:
+        print(f" Resuming: {len(done_ids)} covers already fetched in a previous run")
     
     if not songs_without_cover:
-        print(" All songs already have cover art URLs!")
+        if done_ids:
+            summary = {
+                'last_update': datetime.now().isoformat(),
+                'songs_updated': len(done_ids),
+                'songs_failed': 0,
+                'songs_skipped': 0,
+                'total_processed': len(done_ids)
+            }
+            write_database_streaming(songs_db_path, replay_journal(journal_path), summary)
+            journal_path.unlink()
+            print(" Applied journaled cover art URLs - database saved!")
+        else:
+            print(" All songs already have cover art URLs!")
         return
     
     print(f"\n Preview of songs needing cover art (first 3):")
     for i, (song_id, song_data) in enumerate(songs_without_cover[:3], 1):
-        metadata = song_data.get('metadata', {})
+        metadata = song_data.get('metadata') or _EMPTY_META
         track_name = metadata.get('track_name', 'Unknown')
         artists_string = metadata.get('artists_string', 'Unknown')
         track_uri = metadata.get('track_uri', 'No URI')
@@ -75,64 +359,80 @@ def main():
         return
     
     backup_path = songs_db_path.with_suffix('.backup.json')
-    import shutil
-    shutil.copy2(songs_db_path, backup_path)
+    create_backup(songs_db_path, backup_path)
     print(f" Created backup: {backup_path}")
     
     print(f"\n Processing {len(songs_without_cover)} songs...")
     
     updated_count = 0
     failed_count = 0
-    skipped_count = 0
     
-    for i, (song_id, song_data) in enumerate(songs_without_cover, 1):
-        metadata = song_data.get('metadata', {})
+    # Songs without a usable track URI never reach the HTTP phase
+    valid, skipped = [], []
+    for song_id, song_data in songs_without_cover:
+        metadata = song_data.get('metadata') or _EMPTY_META
+        track_id = extract_track_id_from_uri(metadata.get('track_uri', ''))
+        (valid if track_id else skipped).append((song_id, metadata, track_id))
+    
+    skipped_count = len(skipped)
+    for song_id, metadata, _ in skipped:
+        logger.info("     No valid track URI - skipping %s by %s",
+                    metadata.get('track_name', 'Unknown'), metadata.get('artists_string', 'Unknown'))
+    
+    pending = []
+    # Tracks on the same album share a cover, so only one track per album is looked up
+    album_tracks = {}  # album_uri (or track_id if unknown) -> representative track_id
+    songs_by_track = defaultdict(list)  # representative track_id -> song_ids
+    for song_id, metadata, track_id in valid:
+        lookup_track_id = album_tracks.setdefault(metadata.get('album_uri') or track_id, track_id)
+        pending.append((song_id, metadata, lookup_track_id))
+        songs_by_track[lookup_track_id].append(song_id)
+    
+    # Append-only journal: every resolved cover is persisted immediately,
+    # the database itself is rewritten once at the end. Writes run on a
+    # single background thread (keeps ordering) so disk IO never blocks
+    # the event loop that drives the HTTP requests.
+    with open(journal_path, 'ab') as journal, ThreadPoolExecutor(max_workers=1) as writer:
+        def record_cover(track_id, url):
+            ts = datetime.now().isoformat()
+            lines = b''.join(
+                orjson.dumps({'id': song_id, 'url': url, 'ts': ts}) + b'\n'
+                for song_id in songs_by_track[track_id]
+            )
+            writer.submit(append_journal, journal, lines)
+        
+        print(f" Looking up {len(songs_by_track)} unique albums...")
+        progress = tqdm(total=len(songs_by_track), unit='album') if tqdm else None
+        try:
+            results = asyncio.run(run_all(list(songs_by_track), on_cover=record_cover, progress=progress))
+        finally:
+            if progress:
+                progress.close()
+    
+    for song_id, metadata, track_id in pending:
+        result = results[track_id]
         track_name = metadata.get('track_name', 'Unknown')
         artists_string = metadata.get('artists_string', 'Unknown')
-        track_uri = metadata.get('track_uri', '')
-        
-        print(f"\n [{i}/{len(songs_without_cover)}] {track_name} by {artists_string}")
         
-        track_id = extract_track_id_from_uri(track_uri)
-        
-        if not track_id:
-            print(f"     No valid track URI - skipping")
-            skipped_count += 1
-            continue
-        
-        print(f"    Track ID: {track_id}")
-        
-        try:
-            cover_art_url = get_spotify_image_url(track_id)
-            
-            song_data['metadata']['cover_art_url'] = cover_art_url
-            song_data['metadata']['cover_art_updated_at'] = datetime.now().isoformat()
-            updated_count += 1
-            print(f"    Added: {cover_art_url}")
-            
-        except Exception as e:
+        if isinstance(result, Exception):
             failed_count += 1
-            print(f"    Failed: {e}")
-        
-        time.sleep(0.5)
+            logger.warning("    Failed: %s by %s (%s): %s", track_name, artists_string, track_id, result)
+            continue
         
-        if i % 10 == 0:
-            print(f"    Saving progress...")
-            database['last_updated'] = datetime.now().isoformat()
-            with open(songs_db_path, 'w', encoding='utf-8') as f:
-                json.dump(database, f, indent=2, ensure_ascii=False)
-    
-    database['last_updated'] = datetime.now().isoformat()
-    database['cover_art_update_summary'] = {
+        updated_count += 1
+        logger.debug("    Added: %s by %s -> %s", track_name, artists_string, result)
+    
+    summary = {
         'last_update': datetime.now().isoformat(),
-        'songs_updated': updated_count,
+        'songs_updated': updated_count + len(done_ids),
         'songs_failed': failed_count,
         'songs_skipped': skipped_count,
-        'total_processed': len(songs_without_cover)
+        'total_processed': len(songs_without_cover) + len(done_ids)
     }
     
-    with open(songs_db_path, 'w', encoding='utf-8') as f:
-        json.dump(database, f, indent=2, ensure_ascii=False)
+    updates = replay_journal(journal_path)
+    write_database_streaming(songs_db_path, updates, summary)
+    journal_path.unlink()
     
     print(f"\n Summary:")
     print(f"    Updated: {updated_count}")
@@ -9,20 +9,40 @@ import threading
 import time
 import os
 import re
-import subprocess
 import sys
 import requests
 import hashlib
 import shutil
+import tempfile
+import base64
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Set, Optional, Tuple
-from seleniumwire import webdriver
+from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import gzip
-import brotli
+from selenium.common.exceptions import TimeoutException
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import yt_dlp
+except ImportError:
+    yt_dlp = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+_EMPTY_META = {}  # shared read-only default for songs without metadata
+_SONG_ID_RE = re.compile(r'[^a-z0-9_]')
 
 # === CONFIGURATION ===
 class Config:
@@ -38,7 +58,8 @@ class Config:
     # Download settings
     AUDIO_QUALITY = '192K'
     MAX_RETRIES = 3
-    DOWNLOAD_DELAY = 1  # Seconds between downloads
+    DOWNLOAD_DELAY = 1  # Seconds between download starts
+    MAX_DOWNLOAD_WORKERS = 4  # Parallel yt-dlp downloads
     
     # Metadata settings
     DOWNLOAD_COVER_ART = True
@@ -56,18 +77,104 @@ class Config:
     # Test folder for captured data
     TEST_FOLDER = "test"
     
+    # Output settings
+    VERBOSE = False  # Print a line for every processed track
+    TRACK_LOG_BATCH = 100  # Per-track lines are written to stdout in batches of this size
+    
+    # Network capture settings
+    NETWORK_POLL_INTERVAL = 1  # Seconds between drains of Chrome's network event log
+    
+    # Database persistence settings
+    FILE_BUFFER_SIZE = 1 << 20  # 1 MB read/write buffer for the database files
+    STREAM_PARSE_THRESHOLD = 10 * 1024 * 1024  # Stream-parse songs database files larger than this
+    SAVE_INTERVAL = 30  # Minimum seconds between full database rewrites
+    WAL_MAX_OPS = 500  # Force a full rewrite after this many logged changes
+    
     # Batch processing settings
-    DELAY_BETWEEN_ARTISTS = 3  # Seconds between processing different artists
+    DELAY_BETWEEN_ARTISTS = 1  # Seconds between processing different artists
+    PAGE_LOAD_TIMEOUT = 10  # Maximum seconds to wait for an artist page to render
+    
+    # Browser settings
+    BROWSER_PROFILE_DIR = os.path.join(tempfile.gettempdir(), "spotify_scraper_profile")  # Kept between runs
+    BROWSER_CACHE_SIZE = 256 * 1024 * 1024  # Disk cache for Spotify's JS bundles and assets
     MAX_SCROLL_ATTEMPTS = 100  # Maximum scroll attempts per artist
 
 # === GLOBAL VARIABLES ===
+_TARGET_PREFIX = Config.TARGET_API_URL  # Spotify API calls always start with this URL
+_pending_responses = set()  # CDP request IDs of API responses whose body hasn't finished loading
 captured_data = []
 all_artist_tracks = []
 seen_requests = set()
+_track_log = []  # Buffered per-track output lines
 stop_capture = False
 auto_scroll_active = False
 current_artist_id = ""
 
+# === JSON HELPERS ===
+def load_json_file(path: Path):
+    """Load a JSON file, using orjson when it is installed"""
+    if orjson:
+        with open(path, 'rb', buffering=Config.FILE_BUFFER_SIZE) as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', buffering=Config.FILE_BUFFER_SIZE, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_json_file(path: Path, data):
+    """
+    Write a JSON file (2-space indent, UTF-8), using orjson when it is installed.
+    Written to a temp file first and swapped in with os.replace, so a crash never
+    leaves a half-written database behind.
+    """
+    tmp_path = path.with_suffix('.json.tmp')
+    if orjson:
+        with open(tmp_path, 'wb', buffering=Config.FILE_BUFFER_SIZE) as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(tmp_path, 'w', buffering=Config.FILE_BUFFER_SIZE, encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def iter_json_items(path: Path, key: str):
+    """
+    Yield (id, entry) pairs of a top-level object in a JSON file. Files above
+    Config.STREAM_PARSE_THRESHOLD are stream-parsed with ijson when it is installed,
+    so the whole document is never materialized next to the caller's own copy.
+    """
+    if ijson and path.stat().st_size > Config.STREAM_PARSE_THRESHOLD:
+        with open(path, 'rb', buffering=Config.FILE_BUFFER_SIZE) as f:
+            yield from ijson.kvitems(f, key, use_float=True)
+    else:
+        yield from load_json_file(path).get(key, {}).items()
+
+def file_stamp(path: Path):
+    """[size, mtime_ns] of a file (None if it doesn't exist), identifies the exact version on disk"""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+@lru_cache(maxsize=65536)
+def _generate_song_id(track_name: str, artists: str) -> str:
+    # IDs are stored in the databases and used as file names, so the md5 scheme must not change
+    clean_string = _SONG_ID_RE.sub('', f"{track_name}_{artists}".lower())
+    hash_object = hashlib.md5(clean_string.encode())
+    return f"song_{hash_object.hexdigest()[:12]}"
+
+# === OUTPUT HELPERS ===
+def log_track(message: str):
+    """Buffer a per-track progress line (only with Config.VERBOSE), written out in batches"""
+    if Config.VERBOSE:
+        _track_log.append(message)
+        if len(_track_log) >= Config.TRACK_LOG_BATCH:
+            flush_track_log()
+
+def flush_track_log():
+    """Write the buffered per-track lines with a single stdout write"""
+    if _track_log:
+        sys.stdout.write("\n".join(_track_log) + "\n")
+        _track_log.clear()
+
 # === SMART SONG MANAGER CLASS ===
 class SmartSongManager:
     def __init__(self, consolidated_folder: str = "consolidated_music"):
@@ -84,48 +191,76 @@ class SmartSongManager:
         self.existing_playlists = {}  # playlist_id -> playlist_info
         self.existing_artists = {}  # artist_uri -> artist_info
         self.uri_to_song_id = {}  # track_uri -> song_id
-        self.name_artist_to_song_id = {}  # normalized_name_artist -> song_id
+        self.name_artist_to_song_id = {}  # hash("name|artists") -> song_id, int keys keep the table small
+        self.song_playlist_mapping = {}  # song_id -> the song's own playlists list (aliased, not copied)
+        
+        # Set views of the persisted playlist lists (built on first use) for O(1)
+        # membership tests; the lists themselves stay lists to keep their order
+        self._song_playlists = {}  # song_id -> set of playlist IDs
+        self._artist_playlists = {}  # artist_uri -> set of playlist keys
+        
+        # Changes since the last save are appended to wal.jsonl. flush_if_dirty()
+        # writes the changed songs to a songs_delta_*.json file, flush() folds
+        # everything into the full JSON databases.
+        self.wal_path = self.metadata_folder / 'wal.jsonl'
+        self._wal = None
+        self._pending_ops = 0
+        self._dirty = {'songs': False, 'playlists': False, 'artists': False}
+        self._new_song_ids = set()
+        self._updated_song_ids = set()
+        self._delta_paths = []
+        self._last_flush = time.monotonic()
+        
+        # Version of each database file as we last loaded or saved it. Deltas
+        # record the songs database they extend, and are only merged into that
+        # exact version (another tool may have rewritten it since).
+        self._db_stamps = {'songs': None, 'playlists': None, 'artists': None}
         
         self.load_existing_databases()
+        self.replay_wal()
     
     def load_existing_databases(self):
         """Load existing songs, playlists, and artists databases"""
         # Load songs database
         songs_db_path = self.metadata_folder / 'songs_database.json'
+        self._db_stamps['songs'] = file_stamp(songs_db_path)
         if songs_db_path.exists():
             try:
-                with open(songs_db_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    existing_songs = data.get('songs', {})
-                    
-                    for song_id, song_info in existing_songs.items():
-                        self.existing_songs[song_id] = song_info
-                        
-                        # Build lookup tables
-                        metadata = song_info.get('metadata', {})
-                        track_uri = metadata.get('track_uri', '')
-                        if track_uri:
-                            self.uri_to_song_id[track_uri] = song_id
-                        
-                        # Create name+artist lookup
-                        track_name = metadata.get('track_name', '').lower().strip()
-                        artists = metadata.get('artists_string', '').lower().strip()
-                        if track_name and artists:
-                            key = f"{track_name}|{artists}"
-                            self.name_artist_to_song_id[key] = song_id
+                for song_id, song_info in iter_json_items(songs_db_path, 'songs'):
+                    self.existing_songs[song_id] = song_info
+                    self.index_song(song_id, song_info)
                 
                 print(f"📚 Loaded {len(self.existing_songs)} existing songs from database")
                 
             except Exception as e:
                 print(f"⚠️  Warning: Could not load existing songs database: {e}")
         
+        # Merge songs saved incrementally since the last full save, as long as
+        # the songs database is still the version they were written against
+        for delta_path in sorted(self.metadata_folder.glob('songs_delta_*.json')):
+            try:
+                delta = load_json_file(delta_path)
+                if delta.get('base') != self._db_stamps['songs']:
+                    print(f"⚠️  Warning: Dropping stale songs delta {delta_path.name} (songs database changed since)")
+                    delta_path.unlink(missing_ok=True)
+                    continue
+                for song_id, song_info in delta.get('songs', {}).items():
+                    self.existing_songs[song_id] = song_info
+                    self.index_song(song_id, song_info)
+                self._delta_paths.append(delta_path)
+            except Exception as e:
+                print(f"⚠️  Warning: Could not load songs delta {delta_path.name}: {e}")
+        
+        if self._delta_paths:
+            print(f"📚 Merged {len(self._delta_paths)} incremental songs saves")
+        
         # Load playlists database
         playlists_db_path = self.metadata_folder / 'playlists_database.json'
+        self._db_stamps['playlists'] = file_stamp(playlists_db_path)
         if playlists_db_path.exists():
             try:
-                with open(playlists_db_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.existing_playlists = data.get('playlists', {})
+                data = load_json_file(playlists_db_path)
+                self.existing_playlists = data.get('playlists', {})
                 
                 print(f"📚 Loaded {len(self.existing_playlists)} existing playlists from database")
                 
@@ -134,11 +269,11 @@ class SmartSongManager:
         
         # Load artists database
         artists_db_path = self.metadata_folder / 'artists_database.json'
+        self._db_stamps['artists'] = file_stamp(artists_db_path)
         if artists_db_path.exists():
             try:
-                with open(artists_db_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.existing_artists = data.get('artists', {})
+                data = load_json_file(artists_db_path)
+                self.existing_artists = data.get('artists', {})
                 
                 print(f"📚 Loaded {len(self.existing_artists)} existing artists from database")
                 
@@ -147,97 +282,278 @@ class SmartSongManager:
         else:
             print("🆕 No existing artists database found - starting fresh")
     
+    def index_song(self, song_id: str, song_info: dict):
+        """Add a song to the URI and name+artist lookup tables and the song-playlist mapping"""
+        self.song_playlist_mapping[song_id] = song_info.get('playlists', [])
+        
+        metadata = song_info.get('metadata') or _EMPTY_META
+        track_uri = metadata.get('track_uri', '')
+        if track_uri:
+            self.uri_to_song_id[track_uri] = song_id
+        
+        # Create name+artist lookup
+        track_name = metadata.get('track_name', '').lower().strip()
+        artists = metadata.get('artists_string', '').lower().strip()
+        if track_name and artists:
+            key = f"{track_name}|{artists}"
+            self.name_artist_to_song_id[hash(key)] = song_id
+    
+    @staticmethod
+    def _members(index: dict, key: str, items: list) -> set:
+        """Set view of a persisted list, built the first time it is needed"""
+        members = index.get(key)
+        if members is None:
+            members = index[key] = set(items)
+        return members
+    
+    def _log_op(self, op: dict):
+        """Append a change to the write-ahead log and mark its database dirty"""
+        if self._wal is None:
+            new_log = not self.wal_path.exists()
+            self._wal = open(self.wal_path, 'a', encoding='utf-8')
+            if new_log:
+                # The first line records the databases the log applies to
+                self._wal.write(json.dumps({'op': 'base', 'stamps': self._db_stamps}) + '\n')
+        self._wal.write(json.dumps(op, ensure_ascii=False) + '\n')
+        self._wal.flush()
+        self._pending_ops += 1
+        self._apply_op(op)
+    
+    def _apply_op(self, op: dict):
+        """Apply a logged change to the in-memory databases"""
+        kind = op['op']
+        if kind == 'set_song':
+            self.existing_songs[op['song_id']] = op['song']
+            self._song_playlists.pop(op['song_id'], None)
+            self.index_song(op['song_id'], op['song'])
+            self._new_song_ids.add(op['song_id'])
+            self._dirty['songs'] = True
+        elif kind == 'add_playlist':
+            playlists = self.existing_songs[op['song_id']].setdefault('playlists', [])
+            self.song_playlist_mapping[op['song_id']] = playlists
+            members = self._members(self._song_playlists, op['song_id'], playlists)
+            if op['playlist_id'] not in members:
+                members.add(op['playlist_id'])
+                playlists.append(op['playlist_id'])
+            self._updated_song_ids.add(op['song_id'])
+            self._dirty['songs'] = True
+        elif kind == 'set_download':
+            self.existing_songs[op['song_id']].setdefault('download_info', {}).update(op['download_info'])
+            self._updated_song_ids.add(op['song_id'])
+            self._dirty['songs'] = True
+        elif kind == 'set_playlist':
+            self.existing_playlists[op['playlist_id']] = op['playlist']
+            self._dirty['playlists'] = True
+        elif kind == 'set_artist':
+            self.existing_artists[op['artist_uri']] = op['artist']
+            self._artist_playlists.pop(op['artist_uri'], None)
+            self._dirty['artists'] = True
+        elif kind == 'add_artist_playlist':
+            artist = self.existing_artists[op['artist_uri']]
+            playlist_ids = artist.setdefault('playlist_ids', [])
+            members = self._members(self._artist_playlists, op['artist_uri'], playlist_ids)
+            if op['playlist_id'] not in members:
+                members.add(op['playlist_id'])
+                playlist_ids.append(op['playlist_id'])
+            artist['last_updated'] = op['last_updated']
+            self._dirty['artists'] = True
+    
+    def replay_wal(self):
+        """Re-apply changes logged by an earlier manager or an interrupted run"""
+        if not self.wal_path.exists():
+            return
+        
+        replayed = 0
+        try:
+            with open(self.wal_path, 'r', buffering=Config.FILE_BUFFER_SIZE, encoding='utf-8') as f:
+                # Only replay onto the exact databases the log was written against;
+                # if another tool saved them since, the changes would overwrite its edits
+                try:
+                    header = json.loads(f.readline())
+                except ValueError:
+                    header = {}
+                if header.get('op') != 'base' or header.get('stamps') != self._db_stamps:
+                    print("⚠️  Warning: Discarding stale database log (databases changed since it was written)")
+                    f.close()
+                    self.wal_path.unlink(missing_ok=True)
+                    return
+                
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        self._apply_op(orjson.loads(line) if orjson else json.loads(line))
+                        replayed += 1
+                    except (ValueError, KeyError):
+                        # Torn last line from a crash, or a change to a song that is gone
+                        continue
+        except Exception as e:
+            print(f"⚠️  Warning: Could not replay database log: {e}")
+        
+        self._pending_ops = replayed
+        if replayed:
+            print(f"📝 Replayed {replayed} logged database changes")
+    
+    def add_song(self, song_id: str, song_entry: dict):
+        """Add a new song entry"""
+        self._log_op({'op': 'set_song', 'song_id': song_id, 'song': song_entry})
+    
+    def update_download_info(self, song_id: str, **download_info):
+        """Update download status fields of a song"""
+        self._log_op({'op': 'set_download', 'song_id': song_id, 'download_info': download_info})
+    
+    def set_playlist(self, playlist_id: str, playlist_entry: dict):
+        """Create or replace a playlist entry"""
+        self._log_op({'op': 'set_playlist', 'playlist_id': playlist_id, 'playlist': playlist_entry})
+    
+    def _mark_saved(self):
+        """Truncate the write-ahead log once its changes are on disk"""
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
+        self.wal_path.unlink(missing_ok=True)
+        self._pending_ops = 0
+        self._dirty = dict.fromkeys(self._dirty, False)
+        self._new_song_ids.clear()
+        self._updated_song_ids.clear()
+        self._last_flush = time.monotonic()
+    
+    def save_incremental(self):
+        """Write only the new/updated songs to a delta file, plus the (small) playlists and artists databases"""
+        changed_ids = self._new_song_ids | self._updated_song_ids
+        try:
+            if changed_ids:
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+                delta_path = self.metadata_folder / f'songs_delta_{timestamp}.json'
+                save_json_file(delta_path, {
+                    'songs': {song_id: self.existing_songs[song_id] for song_id in changed_ids},
+                    'base': self._db_stamps['songs'],
+                    'created_at': datetime.now().isoformat()
+                })
+                self._delta_paths.append(delta_path)
+                print(f"💾 Saved {len(changed_ids)} changed songs to {delta_path.name}")
+        except Exception as e:
+            # Keep the log so the changes are replayed on the next run
+            print(f"❌ Error saving songs delta: {e}")
+            return False
+        
+        if not save_databases(self, include_songs=False):
+            return False
+        self._mark_saved()
+        return True
+    
+    def flush(self):
+        """Compact: write the full databases including all deltas, then drop the deltas and the log"""
+        if not save_databases(self):
+            # Keep the log and deltas so the changes are replayed on the next run
+            return False
+        for delta_path in self._delta_paths:
+            delta_path.unlink(missing_ok=True)
+        self._delta_paths = []
+        self._mark_saved()
+        return True
+    
+    def flush_if_dirty(self, min_interval: Optional[float] = None):
+        """Save incrementally if there are unsaved changes and enough time or changes have piled up"""
+        if not any(self._dirty.values()):
+            return False
+        if min_interval is None:
+            min_interval = Config.SAVE_INTERVAL
+        if (time.monotonic() - self._last_flush < min_interval
+                and self._pending_ops < Config.WAL_MAX_OPS):
+            return False
+        return self.save_incremental()
+    
     def generate_song_id(self, track_name: str, artists: str) -> str:
         """Generate a unique ID for a song based on track name and artists"""
-        clean_string = f"{track_name}_{artists}".lower()
-        clean_string = re.sub(r'[^a-z0-9_]', '', clean_string)
-        hash_object = hashlib.md5(clean_string.encode())
-        return f"song_{hash_object.hexdigest()[:12]}"
+        return _generate_song_id(track_name, artists)
     
-    def find_existing_song(self, track_info: dict) -> Optional[Tuple[str, dict]]:
+    def find_existing_song(self, track_info: dict, name_artist_key: Optional[str] = None) -> Optional[Tuple[str, dict]]:
         """
         Find existing song in database
+        name_artist_key: precomputed "name|artists" lookup key, derived from track_info if not given
         Returns: (song_id, song_info) if found, None otherwise
         """
         track_uri = track_info.get('track_uri', '')
-        track_name = track_info.get('track_name', '').lower().strip()
-        artists = track_info.get('artists_string', '').lower().strip()
         
         # First check by URI (most reliable)
-        if track_uri and track_uri in self.uri_to_song_id:
-            song_id = self.uri_to_song_id[track_uri]
+        song_id = self.uri_to_song_id.get(track_uri) if track_uri else None
+        if song_id:
             return song_id, self.existing_songs[song_id]
         
         # Then check by name + artists
-        if track_name and artists:
-            key = f"{track_name}|{artists}"
-            if key in self.name_artist_to_song_id:
-                song_id = self.name_artist_to_song_id[key]
-                return song_id, self.existing_songs[song_id]
+        key = name_artist_key
+        if key is None:
+            track_name = track_info.get('track_name', '').lower().strip()
+            artists = track_info.get('artists_string', '').lower().strip()
+            key = f"{track_name}|{artists}" if track_name and artists else ''
+        song_id = self.name_artist_to_song_id.get(hash(key)) if key else None
+        if song_id:
+            return song_id, self.existing_songs[song_id]
         
         return None
     
     def add_playlist_to_song(self, song_id: str, playlist_id: str):
         """Add playlist ID to existing song without replacing other playlists"""
-        if song_id in self.existing_songs:
-            current_playlists = self.existing_songs[song_id].get('playlists', [])
+        song_info = self.existing_songs.get(song_id)
+        if song_info is not None:
+            current_playlists = self._members(self._song_playlists, song_id, song_info.get('playlists', []))
             if playlist_id not in current_playlists:
-                current_playlists.append(playlist_id)
-                self.existing_songs[song_id]['playlists'] = current_playlists
-                print(f"   ✅ Added playlist {playlist_id} to existing song {song_id}")
+                self._log_op({'op': 'add_playlist', 'song_id': song_id, 'playlist_id': playlist_id})
+                log_track(f"   ✅ Added playlist {playlist_id} to existing song {song_id}")
                 return True
             else:
-                print(f"   ℹ️  Song {song_id} already has playlist {playlist_id}")
+                log_track(f"   ℹ️  Song {song_id} already has playlist {playlist_id}")
                 return False
         return False
     
-    def store_artist_info(self, artist_uri: str, artist_name: str, playlist_key: str):
-        """Store artist information in artists database"""
-        if artist_uri in self.existing_artists:
+    def store_artist_info(self, artist_uri: str, artist_name: str, playlist_key: str,
+                          timestamp: Optional[str] = None):
+        """Store artist information in artists database (timestamp: ISO time to record, defaults to now)"""
+        timestamp = timestamp or datetime.now().isoformat()
+        artist = self.existing_artists.get(artist_uri)
+        if artist is not None:
             # Update existing artist
-            if playlist_key not in self.existing_artists[artist_uri].get('playlist_ids', []):
-                self.existing_artists[artist_uri]['playlist_ids'].append(playlist_key)
-                self.existing_artists[artist_uri]['last_updated'] = datetime.now().isoformat()
+            if playlist_key not in self._members(self._artist_playlists, artist_uri, artist.get('playlist_ids', [])):
+                self._log_op({'op': 'add_artist_playlist', 'artist_uri': artist_uri,
+                              'playlist_id': playlist_key, 'last_updated': timestamp})
         else:
             # Create new artist entry
-            self.existing_artists[artist_uri] = {
+            self._log_op({'op': 'set_artist', 'artist_uri': artist_uri, 'artist': {
                 'name': artist_name,
                 'uri': artist_uri,
                 'playlist_ids': [playlist_key],
-                'created_at': datetime.now().isoformat(),
-                'last_updated': datetime.now().isoformat()
-            }
+                'created_at': timestamp,
+                'last_updated': timestamp
+            }})
 
 # === UTILITY FUNCTIONS ===
-def install_required_packages():
-    """Install required packages if not available"""
-    try:
-        import yt_dlp
-        print("✅ yt-dlp is available")
-    except ImportError:
-        print("📦 Installing yt-dlp...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "yt-dlp"])
-        print("✅ yt-dlp installed successfully")
+def check_required_packages() -> bool:
+    """Check that the required packages are installed (imported once at startup)"""
+    if yt_dlp is None:
+        print("   ❌ yt-dlp not found - install it with: pip install yt-dlp")
+        return False
+    print("   ✅ yt-dlp is available")
+    return True
+
+@lru_cache(maxsize=1)
+def _find_ffmpeg() -> Optional[str]:
+    """Resolve ffmpeg on PATH once per process (no need to run it)"""
+    return shutil.which('ffmpeg')
 
 def check_prerequisites():
     """Check if required tools are available"""
     print("🔧 Checking prerequisites...")
     
-    # Check ffmpeg
-    try:
-        result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True)
-        if result.returncode == 0:
-            print("   ✅ ffmpeg found")
-        else:
-            print("   ❌ ffmpeg not working properly")
-            return False
-    except FileNotFoundError:
+    ffmpeg_path = _find_ffmpeg()
+    if ffmpeg_path:
+        print(f"   ✅ ffmpeg found at {ffmpeg_path}")
+    else:
         print("   ❌ ffmpeg not found - please install ffmpeg")
         print("      Download from: https://ffmpeg.org/download.html")
         return False
     
-    install_required_packages()
-    return True
+    return check_required_packages()
 
 def safe_get(data, *keys, default="Unknown"):
     """Safely navigate nested dictionaries with fallback"""
@@ -255,8 +571,6 @@ def safe_get(data, *keys, default="Unknown"):
 def download_song(track_name: str, artists_string: str, song_id: str, output_folder: Path) -> bool:
     """Download a song using yt-dlp"""
     try:
-        import yt_dlp
-        
         # Create search query
         search_query = f"{track_name} {artists_string}"
         
@@ -294,120 +608,129 @@ def download_song(track_name: str, artists_string: str, song_id: str, output_fol
         print(f"   ❌ Download failed for {track_name}: {e}")
         return False
 
-# === SPOTIFY CAPTURE FUNCTIONS ===
-def decode_response_body(response):
-    """Decode response body handling different compression formats"""
-    try:
-        body = response.body
-        if not body:
-            return ""
-        
-        encoding = response.headers.get('content-encoding', '').lower()
-        
-        if encoding == 'gzip':
-            body = gzip.decompress(body)
-        elif encoding == 'br':
-            body = brotli.decompress(body)
-        elif encoding == 'deflate':
-            import zlib
-            body = zlib.decompress(body)
-        
-        try:
-            return body.decode('utf-8')
-        except UnicodeDecodeError:
-            return body.decode('utf-8', errors='ignore')
-    except Exception as e:
-        print(f"[!] Error decoding response body: {e}")
-        return ""
+class DownloadRateLimiter:
+    """Spaces out download starts across worker threads, at most one per interval"""
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_start = time.monotonic()
+    
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        time.sleep(start - now)
 
-def parse_json_response(body_text):
-    """Try to parse response as JSON"""
+# === SPOTIFY CAPTURE FUNCTIONS ===
+def parse_json_response(body):
+    """Try to parse response as JSON (bytes or str, no separate UTF-8 decode)"""
     try:
-        return json.loads(body_text)
-    except json.JSONDecodeError:
-        return body_text
+        return orjson.loads(body) if orjson else json.loads(body)
+    except ValueError:
+        # Both json.JSONDecodeError and orjson.JSONDecodeError are ValueErrors
+        return body
 
-def is_artist_discography_response(parsed_response):
-    """Check if the response contains artist discography data"""
+def extract_discography_tracks(parsed_response) -> Optional[list]:
+    """Return the tracks array if this is an artist discography response, else None (one walk)"""
     try:
         if isinstance(parsed_response, dict):
-            data = parsed_response.get('data', {})
-            album_union = data.get('albumUnion', {})
-            return album_union.get('__typename') == 'Album'
-        return False
-    except:
-        return False
-
-def extract_tracks_from_response(parsed_response):
-    """Extract the tracks array from artist discography response"""
-    try:
-        if isinstance(parsed_response, dict):
-            data = parsed_response.get('data', {})
-            album_union = data.get('albumUnion', {})
-            tracks_v2 = album_union.get('tracksV2', {})
-            items = tracks_v2.get('items', [])
-            return items
-    except:
+            album_union = (parsed_response.get('data') or _EMPTY_META).get('albumUnion') or _EMPTY_META
+            if album_union.get('__typename') == 'Album':
+                return (album_union.get('tracksV2') or _EMPTY_META).get('items') or []
+    except AttributeError:
         pass
-    return []
+    return None
 
-def request_interceptor(request):
-    """Intercept HTTP requests to capture Spotify API calls"""
-    global captured_data, all_artist_tracks, seen_requests, stop_capture, current_artist_id
+def capture_request(request: dict):
+    """Record a Spotify API request (the CDP Network.Request object)"""
+    global captured_data, seen_requests, current_artist_id
     
     try:
-        if stop_capture:
-            return
+        url = request['url']
+        body = request.get('postData')
+        
+        # Hash url and body incrementally instead of building a concatenated copy
+        hasher = hashlib.blake2b(url.encode(), digest_size=16)
+        hasher.update(body.encode() if body else b'')
+        request_hash = hasher.hexdigest()
         
-        if Config.TARGET_API_URL in request.url:
-            request_hash = hashlib.md5(f"{request.url}{request.body}".encode()).hexdigest()
+        if request_hash not in seen_requests:
+            seen_requests.add(request_hash)
+            captured_data.append({
+                'url': url,
+                'method': request.get('method'),
+                'headers': request.get('headers', {}),
+                'body': body,
+                'timestamp': datetime.now().isoformat(),
+                'hash': request_hash,
+                'artist_id': current_artist_id
+            })
+            
+            print(f"[+] Captured request #{len(captured_data)} for artist {current_artist_id}")
             
-            if request_hash not in seen_requests:
-                seen_requests.add(request_hash)
-                captured_data.append({
-                    'url': request.url,
-                    'method': request.method,
-                    'headers': dict(request.headers),
-                    'body': request.body.decode('utf-8') if request.body else None,
-                    'timestamp': datetime.now().isoformat(),
-                    'hash': request_hash,
-                    'artist_id': current_artist_id
-                })
-                
-                print(f"[+] Captured request #{len(captured_data)} for artist {current_artist_id}")
-                
     except Exception as e:
-        print(f"[!] Error in request interceptor: {e}")
+        print(f"[!] Error capturing request: {e}")
 
-def response_interceptor(request, response):
-    """Intercept HTTP responses to capture Spotify API data"""
-    global captured_data, all_artist_tracks, stop_capture, current_artist_id
+def capture_response(driver, request_id: str):
+    """Fetch a finished Spotify API response body over CDP and collect its tracks"""
+    global all_artist_tracks, current_artist_id
     
     try:
-        if stop_capture:
-            return
+        # Chrome hands the body back already decompressed
+        result = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        body = result.get('body')
+        if result.get('base64Encoded'):
+            body = base64.b64decode(body)
         
-        if Config.TARGET_API_URL in request.url and response.status_code == 200:
-            body_text = decode_response_body(response)
+        # Only discography responses carry albumUnion; skip parsing every other query
+        marker = b'"albumUnion"' if isinstance(body, bytes) else '"albumUnion"'
+        if body and marker in body:
+            tracks = extract_discography_tracks(parse_json_response(body))
             
-            if body_text:
-                parsed_response = parse_json_response(body_text)
+            # Check if this is artist discography data
+            if tracks is not None:
+                print(f"[+] Found {len(tracks)} tracks for artist {current_artist_id}")
                 
-                # Check if this is artist discography data
-                if is_artist_discography_response(parsed_response):
-                    tracks = extract_tracks_from_response(parsed_response)
-                    print(f"[+] Found {len(tracks)} tracks for artist {current_artist_id}")
-                    
-                    for track_item in tracks:
-                        track = track_item.get('track', {})
-                        if track:
-                            all_artist_tracks.append(track)
+                for track_item in tracks:
+                    track = track_item.get('track', {})
+                    if track:
+                        all_artist_tracks.append(track)
                 
     except Exception as e:
-        print(f"[!] Error in response interceptor: {e}")
+        print(f"[!] Error capturing response: {e}")
+
+def drain_network_events(driver):
+    """Process every network event Chrome has buffered since the last drain in one batch"""
+    entries = driver.get_log('performance')
+    if stop_capture:
+        return
+    
+    for entry in entries:
+        message = entry['message']
+        
+        # Most events are unrelated traffic; skip them before parsing
+        if _TARGET_PREFIX not in message and not (_pending_responses and 'Network.loadingFinished' in message):
+            continue
+        
+        event = parse_json_response(message).get('message', {})
+        method = event.get('method')
+        params = event.get('params', {})
+        
+        if method == 'Network.requestWillBeSent':
+            if params['request']['url'].startswith(_TARGET_PREFIX):
+                capture_request(params['request'])
+        elif method == 'Network.responseReceived':
+            response = params['response']
+            if response['url'].startswith(_TARGET_PREFIX) and response['status'] == 200:
+                _pending_responses.add(params['requestId'])
+        elif method == 'Network.loadingFinished' and params['requestId'] in _pending_responses:
+            # The body can only be read once it has fully arrived
+            _pending_responses.discard(params['requestId'])
+            capture_response(driver, params['requestId'])
 
-def wait_for_manual_scroll(artist_id):
-    """Wait for user to manually scroll and press Enter"""
+def wait_for_manual_scroll(driver, artist_id):
+    """Wait for user to manually scroll and press Enter, capturing network events meanwhile"""
     global stop_capture
     
     print(f"\n� Manual Scroll Instructions for Artist {artist_id}:")
@@ -417,7 +740,11 @@ def wait_for_manual_scroll(artist_id):
     print("   4. Press Enter when you've captured all tracks")
     
     print(f"\n⌨️  Press Enter when you're done scrolling for artist {artist_id}...")
-    input()
+    enter_pressed = threading.Event()
+    threading.Thread(target=lambda: (sys.stdin.readline(), enter_pressed.set()), daemon=True).start()
+    while not enter_pressed.wait(Config.NETWORK_POLL_INTERVAL):
+        drain_network_events(driver)
+    drain_network_events(driver)
     
     stop_capture = True
     print(f"✅ Manual scrolling completed for artist {artist_id}")
@@ -486,35 +813,38 @@ def get_multiple_artist_ids():
             print("❌ No valid artist IDs found. Please try again.")
             continue
 
+@lru_cache(maxsize=4)
+def _load_artists_db(artists_db_path: Path, mtime: float) -> dict:
+    # mtime is part of the cache key so a rewritten database is loaded again
+    return load_json_file(artists_db_path)
+
 def get_artist_name_from_database(artist_id: str) -> str:
     """Get artist name from artists database if available"""
     try:
         artists_db_path = Path(Config.CONSOLIDATED_FOLDER) / "metadata" / "artists_database.json"
         if artists_db_path.exists():
-            with open(artists_db_path, 'r', encoding='utf-8') as f:
-                artists_db = json.load(f)
-                artist_uri = f"spotify:artist:{artist_id}"
-                if artist_uri in artists_db.get('artists', {}):
-                    stored_name = artists_db['artists'][artist_uri].get('name', '')
-                    if stored_name and stored_name != 'Unknown Artist':
-                        print(f"📚 Found existing artist in database: {stored_name}")
-                        return stored_name
+            artists_db = _load_artists_db(artists_db_path, artists_db_path.stat().st_mtime)
+            artist_uri = f"spotify:artist:{artist_id}"
+            if artist_uri in artists_db.get('artists', {}):
+                stored_name = artists_db['artists'][artist_uri].get('name', '')
+                if stored_name and stored_name != 'Unknown Artist':
+                    print(f"📚 Found existing artist in database: {stored_name}")
+                    return stored_name
     except Exception as e:
         print(f"⚠️  Could not load artist name from database: {e}")
     
     return ""
 
-def process_artist_tracks(artist_name: str, artist_id: str):
-    """Process captured artist tracks and save to database"""
-    global all_artist_tracks
-    
-    if not all_artist_tracks:
+def process_artist_tracks(song_manager: SmartSongManager, artist_name: str, artist_id: str, tracks: List[dict]):
+    """Process captured artist tracks and save to database (song_manager is shared across artists)"""
+    if not tracks:
         print(f"❌ No tracks found to process for artist: {artist_name}")
         return
     
-    print(f"\n🎵 Processing {len(all_artist_tracks)} tracks for artist: {artist_name}")
+    print(f"\n🎵 Processing {len(tracks)} tracks for artist: {artist_name}")
     
-    song_manager = SmartSongManager()
+    # One timestamp for everything recorded while processing this artist's tracks
+    now_iso = datetime.now().isoformat()
     
     # Create artist playlist entry using artist ID as key for uniqueness
     playlist_key = f"artist_{artist_id}"
@@ -530,38 +860,41 @@ def process_artist_tracks(artist_name: str, artist_id: str):
     
     # Get main artist info for storage
     main_artist_uri = ""
-    if all_artist_tracks:
-        first_track = all_artist_tracks[0]
-        artists_data = safe_get(first_track, 'artists', 'items', default=[])
+    if tracks:
+        first_track = tracks[0]
+        artists_data = (first_track.get('artists') or _EMPTY_META).get('items') or []
+        uri_by_name = {}
         for artist in artists_data:
-            if safe_get(artist, 'profile', 'name') == artist_name:
-                main_artist_uri = safe_get(artist, 'uri', default='')
-                break
+            uri_by_name.setdefault((artist.get('profile') or _EMPTY_META).get('name'), artist.get('uri') or '')
+        main_artist_uri = uri_by_name.get(artist_name, '')
     
-    for track_data in all_artist_tracks:
+    # Artists already stored for this playlist; the same artist is on most tracks
+    seen_artist_uris = set()
+    
+    for track_data in tracks:
         try:
-            # Extract track information
-            track_name = safe_get(track_data, 'name', default='Unknown Track')
-            track_uri = safe_get(track_data, 'uri', default='')
-            duration_ms = safe_get(track_data, 'duration', 'totalMilliseconds', default=0)
+            # Extract track information (direct lookups, this runs for every captured track)
+            track_name = track_data.get('name') or 'Unknown Track'
+            track_uri = track_data.get('uri') or ''
+            duration_ms = (track_data.get('duration') or _EMPTY_META).get('totalMilliseconds') or 0
             
-            # Extract artists information
-            artists_data = safe_get(track_data, 'artists', 'items', default=[])
-            artists_info = []
-            artists_names = []
+            # Extract artists information; names and URIs repeat on nearly every
+            # track of a discography, so they are interned to share one string each
+            artists_data = (track_data.get('artists') or _EMPTY_META).get('items') or []
+            artists_info = [
+                {
+                    'name': sys.intern((artist.get('profile') or _EMPTY_META).get('name') or 'Unknown Artist'),
+                    'uri': sys.intern(artist.get('uri') or '')
+                }
+                for artist in artists_data
+            ]
+            artists_names = [artist['name'] for artist in artists_info]
             
-            for artist in artists_data:
-                artist_name_individual = safe_get(artist, 'profile', 'name', default='Unknown Artist')
-                artist_uri = safe_get(artist, 'uri', default='')
-                
-                artists_info.append({
-                    'name': artist_name_individual,
-                    'uri': artist_uri
-                })
-                artists_names.append(artist_name_individual)
-                
-                # Store artist info in artists database
-                song_manager.store_artist_info(artist_uri, artist_name_individual, playlist_key)
+            # Store artist info in artists database (once per artist)
+            for artist in artists_info:
+                if artist['uri'] not in seen_artist_uris:
+                    seen_artist_uris.add(artist['uri'])
+                    song_manager.store_artist_info(artist['uri'], artist['name'], playlist_key, now_iso)
             
             artists_string = ', '.join(artists_names)
             
@@ -579,8 +912,13 @@ def process_artist_tracks(artist_name: str, artist_id: str):
             # Generate song ID
             song_id = song_manager.generate_song_id(track_name, artists_string)
             
+            # Normalized once here; not stored in track_info since that gets persisted
+            norm_name = track_name.lower().strip()
+            norm_artists = artists_string.lower().strip()
+            name_artist_key = f"{norm_name}|{norm_artists}" if norm_name and norm_artists else ''
+            
             # Check if song already exists
-            existing_song = song_manager.find_existing_song(track_info)
+            existing_song = song_manager.find_existing_song(track_info, name_artist_key)
             
             if existing_song:
                 # Song exists, add playlist ID to it
@@ -588,7 +926,7 @@ def process_artist_tracks(artist_name: str, artist_id: str):
                 if song_manager.add_playlist_to_song(existing_song_id, playlist_key):
                     existing_songs_updated += 1
                 song_ids.append(existing_song_id)
-                print(f"   🔄 Updated existing song: {track_name} by {artists_string}")
+                log_track(f"   🔄 Updated existing song: {track_name} by {artists_string}")
             else:
                 # New song, create entry and mark for download
                 song_entry = {
@@ -601,20 +939,23 @@ def process_artist_tracks(artist_name: str, artist_id: str):
                         'quality': Config.AUDIO_QUALITY,
                         'downloaded_at': None
                     },
-                    'added_at': datetime.now().isoformat()
+                    'added_at': now_iso
                 }
                 
-                song_manager.existing_songs[song_id] = song_entry
+                song_manager.add_song(song_id, song_entry)
                 new_songs_to_download.append((song_id, track_name, artists_string))
                 song_ids.append(song_id)
-                print(f"   ✅ New song added: {track_name} by {artists_string}")
+                log_track(f"   ✅ New song added: {track_name} by {artists_string}")
             
             processed_tracks.append(track_info)
             
         except Exception as e:
+            flush_track_log()
             print(f"   ❌ Error processing track: {e}")
             continue
     
+    flush_track_log()
+    
     # Create playlist entry
     successful_downloads = sum(1 for song_id in song_ids 
                              if song_manager.existing_songs.get(song_id, {}).get('download_info', {}).get('status') == 'completed')
@@ -627,18 +968,18 @@ def process_artist_tracks(artist_name: str, artist_id: str):
         'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         'songs': song_ids,
         'unique_song_count': len(song_ids),
-        'created_at': datetime.now().isoformat(),
-        'last_updated': datetime.now().isoformat()
+        'created_at': now_iso,
+        'last_updated': now_iso
     }
     
-    song_manager.existing_playlists[playlist_key] = playlist_entry
+    song_manager.set_playlist(playlist_key, playlist_entry)
     
     # Store main artist info
     if main_artist_uri:
-        song_manager.store_artist_info(main_artist_uri, artist_name, playlist_key)
+        song_manager.store_artist_info(main_artist_uri, artist_name, playlist_key, now_iso)
     
-    # Save databases
-    save_databases(song_manager)
+    # Save databases (debounced, changes are in the write-ahead log meanwhile)
+    song_manager.flush_if_dirty()
     
     print(f"\n📊 Processing Summary for {artist_name}:")
     print(f"   ✅ Total tracks processed: {len(processed_tracks)}")
@@ -651,97 +992,113 @@ def process_artist_tracks(artist_name: str, artist_id: str):
     if new_songs_to_download:
         print(f"\n🎵 Starting downloads for {len(new_songs_to_download)} new songs...")
         successful_downloads = 0
+        limiter = DownloadRateLimiter(Config.DOWNLOAD_DELAY)
         
-        for song_id, track_name, artists_string in new_songs_to_download:
-            try:
-                print(f"\n📥 Downloading: {track_name} by {artists_string}")
+        def rate_limited_download(song_id, track_name, artists_string):
+            limiter.wait()
+            print(f"\n📥 Downloading: {track_name} by {artists_string}")
+            return download_song(track_name, artists_string, song_id, song_manager.songs_folder)
+        
+        # Downloads run on worker threads; results are recorded here on the
+        # calling thread as they finish, so the song manager is never shared
+        with ThreadPoolExecutor(max_workers=Config.MAX_DOWNLOAD_WORKERS) as executor:
+            futures = {executor.submit(rate_limited_download, *song): song for song in new_songs_to_download}
+            
+            for future in as_completed(futures):
+                song_id, track_name, artists_string = futures[future]
+                try:
+                    downloaded = future.result()
+                except Exception as e:
+                    print(f"   ❌ Download error for {track_name}: {e}")
+                    song_manager.update_download_info(song_id, status='failed')
+                    continue
                 
-                if download_song(track_name, artists_string, song_id, song_manager.songs_folder):
+                if downloaded:
                     # Update download status
-                    song_manager.existing_songs[song_id]['download_info'].update({
-                        'status': 'completed',
-                        'file_path': str(song_manager.songs_folder / f"{song_id}.mp3"),
-                        'downloaded_at': datetime.now().isoformat()
-                    })
+                    song_manager.update_download_info(
+                        song_id,
+                        status='completed',
+                        file_path=str(song_manager.songs_folder / f"{song_id}.mp3"),
+                        downloaded_at=datetime.now().isoformat()
+                    )
                     
                     successful_downloads += 1
                     print(f"   ✅ Successfully downloaded: {track_name}")
                 else:
                     # Mark as failed
-                    song_manager.existing_songs[song_id]['download_info']['status'] = 'failed'
+                    song_manager.update_download_info(song_id, status='failed')
                     print(f"   ❌ Failed to download: {track_name}")
-                
-                # Small delay between downloads
-                time.sleep(Config.DOWNLOAD_DELAY)
-                
-            except Exception as e:
-                print(f"   ❌ Download error for {track_name}: {e}")
-                song_manager.existing_songs[song_id]['download_info']['status'] = 'failed'
         
         # Update playlist with final successful downloads count
-        song_manager.existing_playlists[playlist_key]['successful_downloads'] = successful_downloads
-        song_manager.existing_playlists[playlist_key]['last_updated'] = datetime.now().isoformat()
-        save_databases(song_manager)
+        playlist_entry = dict(song_manager.existing_playlists[playlist_key])
+        playlist_entry['successful_downloads'] = successful_downloads
+        playlist_entry['last_updated'] = datetime.now().isoformat()
+        song_manager.set_playlist(playlist_key, playlist_entry)
+        song_manager.flush_if_dirty()
         print(f"\n💾 Updated databases - {successful_downloads} successful downloads for {artist_name}")
 
-def save_databases(song_manager: SmartSongManager):
-    """Save songs, playlists, and artists databases"""
+def save_databases(song_manager: SmartSongManager, include_songs: bool = True):
+    """Save the songs, playlists, and artists databases that have unsaved changes"""
+    dirty = song_manager._dirty
+    # Songs merged from delta files are not in songs_database.json yet
+    save_songs = include_songs and (dirty['songs'] or song_manager._delta_paths)
+    now_iso = datetime.now().isoformat()
     try:
-        # Save songs database
-        songs_db = {
-            'songs': song_manager.existing_songs,
-            'total_songs': len(song_manager.existing_songs),
-            'last_updated': datetime.now().isoformat()
-        }
-        
-        songs_db_path = song_manager.metadata_folder / 'songs_database.json'
-        with open(songs_db_path, 'w', encoding='utf-8') as f:
-            json.dump(songs_db, f, indent=2, ensure_ascii=False)
-        
-        # Save playlists database
-        playlists_db = {
-            'playlists': song_manager.existing_playlists,
-            'total_playlists': len(song_manager.existing_playlists),
-            'last_updated': datetime.now().isoformat()
-        }
-        
-        playlists_db_path = song_manager.metadata_folder / 'playlists_database.json'
-        with open(playlists_db_path, 'w', encoding='utf-8') as f:
-            json.dump(playlists_db, f, indent=2, ensure_ascii=False)
-        
-        # Save artists database
-        artists_db = {
-            'artists': song_manager.existing_artists,
-            'total_artists': len(song_manager.existing_artists),
-            'last_updated': datetime.now().isoformat()
-        }
-        
-        artists_db_path = song_manager.metadata_folder / 'artists_database.json'
-        with open(artists_db_path, 'w', encoding='utf-8') as f:
-            json.dump(artists_db, f, indent=2, ensure_ascii=False)
+        if save_songs:
+            # Save songs database
+            songs_db = {
+                'songs': song_manager.existing_songs,
+                'total_songs': len(song_manager.existing_songs),
+                'last_updated': now_iso
+            }
+            
+            songs_db_path = song_manager.metadata_folder / 'songs_database.json'
+            save_json_file(songs_db_path, songs_db)
+            song_manager._db_stamps['songs'] = file_stamp(songs_db_path)
         
-        # Save song-playlist mapping
-        song_playlist_mapping = {}
-        for song_id, song_info in song_manager.existing_songs.items():
-            playlists = song_info.get('playlists', [])
-            song_playlist_mapping[song_id] = playlists
+        if dirty['playlists']:
+            # Save playlists database
+            playlists_db = {
+                'playlists': song_manager.existing_playlists,
+                'total_playlists': len(song_manager.existing_playlists),
+                'last_updated': now_iso
+            }
+            
+            playlists_db_path = song_manager.metadata_folder / 'playlists_database.json'
+            save_json_file(playlists_db_path, playlists_db)
+            song_manager._db_stamps['playlists'] = file_stamp(playlists_db_path)
         
-        mapping_db = {
-            'mapping': song_playlist_mapping,
-            'last_updated': datetime.now().isoformat()
-        }
+        if dirty['artists']:
+            # Save artists database
+            artists_db = {
+                'artists': song_manager.existing_artists,
+                'total_artists': len(song_manager.existing_artists),
+                'last_updated': now_iso
+            }
+            
+            artists_db_path = song_manager.metadata_folder / 'artists_database.json'
+            save_json_file(artists_db_path, artists_db)
+            song_manager._db_stamps['artists'] = file_stamp(artists_db_path)
         
-        mapping_db_path = song_manager.metadata_folder / 'song_playlist_mapping.json'
-        with open(mapping_db_path, 'w', encoding='utf-8') as f:
-            json.dump(mapping_db, f, indent=2, ensure_ascii=False)
+        if save_songs:
+            # Save song-playlist mapping (kept up to date by the song manager)
+            mapping_db = {
+                'mapping': song_manager.song_playlist_mapping,
+                'last_updated': now_iso
+            }
+            
+            mapping_db_path = song_manager.metadata_folder / 'song_playlist_mapping.json'
+            save_json_file(mapping_db_path, mapping_db)
         
         print(f"💾 Saved databases:")
         print(f"   📚 Songs: {len(song_manager.existing_songs)}")
         print(f"   📋 Playlists: {len(song_manager.existing_playlists)}")
         print(f"   🎤 Artists: {len(song_manager.existing_artists)}")
+        return True
         
     except Exception as e:
         print(f"❌ Error saving databases: {e}")
+        return False
 
 def main():
     """Main function to run the batch artist discography scraper"""
@@ -756,7 +1113,7 @@ def main():
         return
     
     # Get multiple artist IDs from user
-    artist_ids = get_multiple_artist_ids()
+    artist_ids = list(dict.fromkeys(get_multiple_artist_ids()))  # Each artist once, in input order
     Config.ARTIST_IDS = artist_ids
     
     print(f"\n🎯 Will process {len(artist_ids)} artists:")
@@ -779,14 +1136,29 @@ def main():
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option('useAutomationExtension', False)
     
+    # Persistent profile: cookies/login and the HTTP cache survive across
+    # artists and runs, so Spotify's app bundles aren't refetched every time
+    os.makedirs(Config.BROWSER_PROFILE_DIR, exist_ok=True)
+    options.add_argument(f"--user-data-dir={Config.BROWSER_PROFILE_DIR}")
+    options.add_argument(f"--disk-cache-dir={os.path.join(Config.BROWSER_PROFILE_DIR, 'cache')}")
+    options.add_argument(f"--disk-cache-size={Config.BROWSER_CACHE_SIZE}")
+    
+    # get() returns at DOMContentLoaded; the page wait below covers the rest
+    options.page_load_strategy = 'eager'
+    
+    # Network traffic is read from Chrome's own performance log (CDP events)
+    # rather than through an intercepting proxy
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+    
     driver = webdriver.Chrome(options=options)
-    driver.request_interceptor = request_interceptor
-    driver.response_interceptor = response_interceptor
+    driver.execute_cdp_cmd('Network.enable', {})
     
-    # Dictionary to store all collected artist data
-    all_artists_data = {}
+    # (artist_id, artist_name, tracks) for every artist with captured tracks, in order
+    all_artists_data = []
     total_data_collected = 0
     total_errors = 0
+    song_manager = None
     
     try:
         print("🌐 Browser opened successfully")
@@ -801,7 +1173,10 @@ def main():
             print(f"🎤 Collecting Data from Artist {i}/{len(artist_ids)}: {artist_id}")
             print(f"{'='*60}")
             
-            # Reset global variables for this artist
+            # Reset global variables for this artist, dropping network events
+            # left over from the previous artist page
+            driver.get_log('performance')
+            _pending_responses.clear()
             current_artist_id = artist_id
             all_artist_tracks = []
             stop_capture = False
@@ -811,13 +1186,19 @@ def main():
                 artist_url = f"https://open.spotify.com/artist/{artist_id}/discography/all"
                 print(f"🔗 Opening: {artist_url}")
                 
-                # Navigate to artist page
+                # Navigate to artist page, then wait only until the app has
+                # rendered its main content
                 driver.get(artist_url)
                 print("⏳ Waiting for page to load...")
-                time.sleep(5)
+                try:
+                    WebDriverWait(driver, Config.PAGE_LOAD_TIMEOUT).until(
+                        EC.presence_of_element_located((By.TAG_NAME, "main"))
+                    )
+                except TimeoutException:
+                    print(f"⚠️  Page still loading after {Config.PAGE_LOAD_TIMEOUT}s, continuing anyway")
                 
                 # Wait for manual scrolling
-                wait_for_manual_scroll(artist_id)
+                wait_for_manual_scroll(driver, artist_id)
                 
                 print(f"📊 Data Collection Summary for Artist {artist_id}:")
                 print(f"   🎵 Tracks Found: {len(all_artist_tracks)}")
@@ -841,11 +1222,8 @@ def main():
                     print(f"🆔 Artist ID: {artist_id}")
                     
                     # Store collected data for later processing
-                    all_artists_data[artist_id] = {
-                        'artist_name': artist_name,
-                        'artist_id': artist_id,
-                        'tracks': all_artist_tracks.copy()
-                    }
+                    # Hand the list itself over; the global is rebound to a fresh list for the next artist
+                    all_artists_data.append((artist_id, artist_name, all_artist_tracks))
                     
                     total_data_collected += 1
                     print(f"✅ Data collected for artist: {artist_name}")
@@ -881,22 +1259,22 @@ def main():
             total_processed = 0
             processing_errors = 0
             
-            for artist_id, artist_data in all_artists_data.items():
+            # Databases are loaded once and shared by all artists
+            song_manager = SmartSongManager(Config.CONSOLIDATED_FOLDER)
+            
+            for artist_id, artist_name, tracks in all_artists_data:
                 try:
                     print(f"\n{'='*60}")
-                    print(f"🔄 Processing collected data for: {artist_data['artist_name']}")
+                    print(f"🔄 Processing collected data for: {artist_name}")
                     print(f"{'='*60}")
                     
-                    # Temporarily set global variables for processing
-                    all_artist_tracks = artist_data['tracks']
-                    
                     # Process tracks (this includes downloads)
-                    process_artist_tracks(artist_data['artist_name'], artist_data['artist_id'])
+                    process_artist_tracks(song_manager, artist_name, artist_id, tracks)
                     total_processed += 1
-                    print(f"✅ Successfully processed and downloaded for: {artist_data['artist_name']}")
+                    print(f"✅ Successfully processed and downloaded for: {artist_name}")
                     
                 except Exception as e:
-                    print(f"❌ Error processing artist {artist_data['artist_name']}: {e}")
+                    print(f"❌ Error processing artist {artist_name}: {e}")
                     processing_errors += 1
                     continue
             
@@ -919,6 +1297,10 @@ def main():
         print(f"❌ Critical error: {e}")
     
     finally:
+        # Fold the incremental saves and the write-ahead log into the full
+        # databases on every exit, including errors and Ctrl+C
+        if song_manager is not None:
+            song_manager.flush()
         print("🎉 All done!")
 
 # Run the main function
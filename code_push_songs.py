@@ -1,6 +1,11 @@
 import os
 import base64
+import hashlib
+import itertools
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -21,46 +26,141 @@ headers = {
     "Accept": "application/vnd.github.v3+json"
 }
 
-# ✅ Get SHA for existing file (for update support)
-def get_existing_file_sha(remote_filename):
-    url = f"https://api.github.com/repos/{OWNER}/{REPO}/contents/{REMOTE_SONGS_FOLDER}/{remote_filename}?ref={BRANCH}"
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json().get("sha")
-    return None
+API_URL = f"https://api.github.com/repos/{OWNER}/{REPO}"
+MAX_UPLOAD_WORKERS = 16
+B64_CHUNK_SIZE = 3 * 256 * 1024
 
-# ✅ Upload or update file to GitHub
-def upload_file(local_path, remote_filename):
-    with open(local_path, "rb") as f:
-        content = base64.b64encode(f.read()).decode()
+# ✅ Keep-alive session that retries 5xx responses, only for the given methods
+def make_session(retry_methods=Retry.DEFAULT_ALLOWED_METHODS):
+    session = requests.Session()
+    session.headers.update(headers)
+    session.mount("https://", HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504], allowed_methods=retry_methods)
+    ))
+    return session
 
-    sha = get_existing_file_sha(remote_filename)
+# ✅ Tree/commit/ref calls only retry idempotent methods; blob POSTs are
+# content-addressed (a repeat returns the same SHA), so those retry too
+SESSION = make_session()
+BLOB_SESSION = make_session(Retry.DEFAULT_ALLOWED_METHODS | {"POST"})
 
-    payload = {
-        "message": f"{'Update' if sha else 'Add'} {remote_filename}",
-        "content": content,
-        "branch": BRANCH
-    }
-
-    if sha:
-        payload["sha"] = sha
-
-    url = f"https://api.github.com/repos/{OWNER}/{REPO}/contents/{REMOTE_SONGS_FOLDER}/{remote_filename}"
-    response = requests.put(url, headers=headers, json=payload)
-
-    if response.status_code in [200, 201]:
-        print(f"✅ {'Updated' if sha else 'Uploaded'}: {remote_filename}")
-        try:
-            os.remove(local_path)
-            print(f"🗑️  Deleted local file: {local_path}")
-        except Exception as e:
-            print(f"❌ Could not delete {local_path}: {e}")
-    else:
+# ✅ Call the GitHub API, raising with the response details on failure
+def github_request(method, path, session=SESSION, **kwargs):
+    response = session.request(method, f"{API_URL}{path}", **kwargs)
+    if response.status_code not in [200, 201]:
         try:
             error_detail = response.json()
         except ValueError:
             error_detail = response.text
-        print(f"❌ Failed: {remote_filename} | {response.status_code} | {error_detail}")
+        raise RuntimeError(f"{method} {path} | {response.status_code} | {error_detail}")
+    return response.json()
+
+# ✅ Current branch head: (commit SHA, root tree SHA)
+def fetch_branch_head():
+    head_sha = github_request("GET", f"/git/ref/heads/{BRANCH}")["object"]["sha"]
+    return head_sha, github_request("GET", f"/git/commits/{head_sha}")["tree"]["sha"]
+
+# ✅ List the remote folder once: filename -> blob SHA (replaces a GET per file)
+# Walks the Git Trees API down from the root tree, one level per path segment,
+# since the Contents API stops listing a directory at 1,000 entries
+def fetch_remote_index(root_tree_sha):
+    tree_sha = root_tree_sha
+    for segment in REMOTE_SONGS_FOLDER.split("/"):
+        entries = github_request("GET", f"/git/trees/{tree_sha}")["tree"]
+        tree_sha = next((e["sha"] for e in entries if e["type"] == "tree" and e["path"] == segment), None)
+        if tree_sha is None:
+            return {}  # Folder doesn't exist yet
+
+    listing = github_request("GET", f"/git/trees/{tree_sha}")
+    if listing.get("truncated"):
+        raise RuntimeError(f"Tree listing of {REMOTE_SONGS_FOLDER} was truncated by GitHub")
+    return {e["path"]: e["sha"] for e in listing["tree"] if e["type"] == "blob"}
+
+# ✅ The SHA git would give this file as a blob (sha1 of "blob <size>\0" + content)
+def git_blob_sha1(path):
+    hasher = hashlib.sha1(f"blob {os.path.getsize(path)}\0".encode())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+# ✅ Base64-encode a file piece by piece (chunk is a multiple of 3, so no padding mid-stream)
+def encode_file_b64_streaming(path, chunk=B64_CHUNK_SIZE):
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(chunk)
+            if not data:
+                break
+            yield base64.b64encode(data)
+
+# ✅ JSON body for POST /git/blobs, encoded while it is sent instead of held in memory
+class BlobBody:
+    PREFIX = b'{"encoding": "base64", "content": "'
+    SUFFIX = b'"}'
+
+    def __init__(self, path):
+        self.path = path
+        self.len = len(self.PREFIX) + 4 * ((os.path.getsize(path) + 2) // 3) + len(self.SUFFIX)
+        self.seek(0)
+
+    def seek(self, pos, whence=0):
+        # Only ever rewound to the start (urllib3 does this before a retry)
+        self._parts = itertools.chain([self.PREFIX], encode_file_b64_streaming(self.path), [self.SUFFIX])
+        self._current = b""
+        self._offset = 0
+        self._pos = 0
+
+    def tell(self):
+        return self._pos
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            data = self._current[self._offset:] + b"".join(self._parts)
+        else:
+            if self._offset >= len(self._current):
+                self._current = next(self._parts, b"")
+                self._offset = 0
+            data = self._current[self._offset:self._offset + size]
+        self._offset += len(data)
+        self._pos += len(data)
+        return data
+
+# ✅ Upload a file's contents as a git blob, returns the blob SHA
+def create_blob(local_path):
+    return github_request("POST", "/git/blobs", session=BLOB_SESSION, data=BlobBody(local_path),
+                          headers={"Content-Type": "application/json"})["sha"]
+
+# ✅ Commit all files at once: blobs -> one tree -> one commit -> move the branch
+def build_tree_and_commit(files, message, head_sha, base_tree_sha):
+    """files: list of (local_path, remote_filename), on top of the head from fetch_branch_head(). Returns the new commit SHA"""
+
+    # Blobs are independent, so they are uploaded concurrently
+    blob_shas = {}
+    with ThreadPoolExecutor(max_workers=MAX_UPLOAD_WORKERS) as executor:
+        futures = {executor.submit(create_blob, local_path): remote_filename for local_path, remote_filename in files}
+        for future in as_completed(futures):
+            blob_shas[futures[future]] = future.result()
+            print(f"📦 Prepared: {futures[future]}")
+
+    tree = []
+    for local_path, remote_filename in files:
+        tree.append({
+            "path": f"{REMOTE_SONGS_FOLDER}/{remote_filename}",
+            "mode": "100644",
+            "type": "blob",
+            "sha": blob_shas[remote_filename]
+        })
+
+    tree_sha = github_request("POST", "/git/trees", json={"base_tree": base_tree_sha, "tree": tree})["sha"]
+    commit_sha = github_request("POST", "/git/commits", json={
+        "message": message,
+        "tree": tree_sha,
+        "parents": [head_sha]
+    })["sha"]
+    github_request("PATCH", f"/git/refs/heads/{BRANCH}", json={"sha": commit_sha})
+    return commit_sha
 
 # ✅ Main function
 def main():
@@ -68,10 +168,49 @@ def main():
         print("❌ Folder not found:", LOCAL_SONGS_FOLDER)
         return
 
+    files = []
     for file in os.listdir(LOCAL_SONGS_FOLDER):
         local_file_path = os.path.join(LOCAL_SONGS_FOLDER, file)
         if os.path.isfile(local_file_path):
-            upload_file(local_file_path, file)
+            files.append((local_file_path, file))
+
+    if not files:
+        print("ℹ️  No songs to push")
+        return
+
+    try:
+        head_sha, base_tree_sha = fetch_branch_head()
+        remote_sha = fetch_remote_index(base_tree_sha)
+
+        # Files whose blob SHA already matches the remote copy need no upload
+        changed = []
+        for local_file_path, remote_filename in files:
+            if remote_sha.get(remote_filename) == git_blob_sha1(local_file_path):
+                print(f"⏭️ Unchanged: {remote_filename}")
+            else:
+                changed.append((local_file_path, remote_filename))
+
+        if changed:
+            commit_sha = build_tree_and_commit(changed, f"Add {len(changed)} songs", head_sha, base_tree_sha)
+    except Exception as e:
+        # Nothing is deleted locally unless the commit went through
+        print(f"❌ Failed: {e}")
+        return
+
+    for _, remote_filename in changed:
+        print(f"✅ {'Updated' if remote_filename in remote_sha else 'Uploaded'}: {remote_filename}")
+    if changed:
+        print(f"🎉 Committed {len(changed)} songs: {commit_sha}")
+    else:
+        print("ℹ️  All songs are already up to date on the branch")
+
+    # ✅ Delete local copies now that they are on the branch
+    for local_file_path, remote_filename in files:
+        try:
+            os.remove(local_file_path)
+            print(f"🗑️  Deleted local file: {local_file_path}")
+        except Exception as e:
+            print(f"❌ Could not delete {local_file_path}: {e}")
 
 if __name__ == "__main__":
     main()
@@ -8,21 +8,34 @@ checks if they exist locally, and downloads any missing songs.
 
 import json
 import os
-import sys
-import subprocess
-import time
 import hashlib
 import re
+import shutil
+import atexit
+import queue
+from collections import defaultdict
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Set, Optional, Tuple
+from typing import Dict, List, NamedTuple, Set, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import yt_dlp
+except ImportError:
+    yt_dlp = None
 
 # === CONFIGURATION ===
 class Config:
     # Download settings
     AUDIO_QUALITY = '192K'
     MAX_RETRIES = 3
-    DOWNLOAD_DELAY = 1  # Seconds between downloads
+    DOWNLOAD_WORKERS = 4  # Parallel yt-dlp downloads
     
     # Paths
     CONSOLIDATED_FOLDER = "consolidated_music"
@@ -35,43 +48,36 @@ class Config:
     MAPPING_DB_FILE = os.path.join(METADATA_FOLDER, "song_playlist_mapping.json")
 
 # === UTILITY FUNCTIONS ===
-def install_required_packages():
-    """Install required packages if not available"""
-    try:
-        import yt_dlp
-        print("✅ yt-dlp is available")
-    except ImportError:
-        print("📦 Installing yt-dlp...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "yt-dlp"])
-        print("✅ yt-dlp installed successfully")
-    
-    try:
-        import requests
-        print("✅ requests is available")
-    except ImportError:
-        print("📦 Installing requests...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "requests"])
-        print("✅ requests installed successfully")
+def check_required_packages() -> bool:
+    """Check that the required packages are installed (imported once at startup)"""
+    if yt_dlp is None:
+        print("   ❌ yt-dlp not found - install it with: pip install yt-dlp")
+        return False
+    print("   ✅ yt-dlp is available")
+    return True
+
+@lru_cache(maxsize=1)
+def _find_ffmpeg() -> Optional[str]:
+    """Resolve ffmpeg on PATH once per process (no need to run it)"""
+    return shutil.which('ffmpeg')
 
 def check_prerequisites():
     """Check if required tools are available"""
     print("🔧 Checking prerequisites...")
     
-    # Check ffmpeg
-    try:
-        result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True)
-        if result.returncode == 0:
-            print("   ✅ ffmpeg found")
-        else:
-            print("   ❌ ffmpeg not working properly")
-            return False
-    except FileNotFoundError:
+    ffmpeg_path = _find_ffmpeg()
+    if ffmpeg_path:
+        print(f"   ✅ ffmpeg found at {ffmpeg_path}")
+    else:
         print("   ❌ ffmpeg not found - please install ffmpeg")
         print("      Download from: https://ffmpeg.org/download.html")
         return False
     
-    install_required_packages()
-    return True
+    return check_required_packages()
+
+# Everything that isn't a word char, whitespace or dash (this also covers <>:"/\|?*)
+_NONWORD_RE = re.compile(r'[^\w\s-]+')
+_DASH_COLLAPSE_RE = re.compile(r'[-\s]+')
 
 def sanitize_filename(filename):
     """Remove invalid characters from filename"""
@@ -79,11 +85,8 @@ def sanitize_filename(filename):
         if not filename or not str(filename).strip():
             return "unknown_file"
         
-        filename = str(filename).strip()
-        filename = re.sub(r'[<>:"/\\|?*]', '', filename)
-        filename = re.sub(r'[^\w\s-]', '', filename)
-        filename = re.sub(r'[-\s]+', '-', filename)
-        result = filename.strip('-')[:100]
+        filename = _NONWORD_RE.sub('', str(filename).strip())
+        result = _DASH_COLLAPSE_RE.sub('-', filename).strip('-')[:100]
         
         return result if result else "unknown_file"
     except Exception as e:
@@ -97,74 +100,122 @@ def load_json_file(file_path: str) -> dict:
             print(f"❌ File not found: {file_path}")
             return {}
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        return orjson.loads(raw) if orjson else json.loads(raw)
     except Exception as e:
         print(f"❌ Error loading {file_path}: {e}")
         return {}
 
 def save_json_file(file_path: str, data: dict):
-    """Save JSON file with error handling"""
+    """Save compact JSON with error handling (written to a temp file, then swapped in atomically)"""
     try:
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        if orjson:
+            raw = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        else:
+            raw = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        
+        tmp_path = file_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(raw)
+        os.replace(tmp_path, file_path)
         return True
     except Exception as e:
         print(f"❌ Error saving {file_path}: {e}")
         return False
 
+def _retry_backoff(attempt: int) -> float:
+    """Seconds yt-dlp sleeps before retry number `attempt` (0.3s, 0.6s, 1.2s, ...)"""
+    return 0.3 * (2 ** attempt)
+
+# yt-dlp options for MP3 download only; outtmpl is set per song. All HTTP goes
+# through yt-dlp's own request handlers, which keep their connection pools for
+# as long as the (pooled) YoutubeDL instance lives; retries back off exponentially.
+BASE_YDL_OPTS = {
+    'format': 'bestaudio/best',
+    'extractaudio': True,
+    'audioformat': 'mp3',
+    'audioquality': Config.AUDIO_QUALITY,
+    'postprocessors': [{
+        'key': 'FFmpegExtractAudio',
+        'preferredcodec': 'mp3',
+        'preferredquality': Config.AUDIO_QUALITY,
+    }],
+    'quiet': True,
+    'no_warnings': True,
+    'retries': Config.MAX_RETRIES,
+    'fragment_retries': Config.MAX_RETRIES,
+    'extractor_retries': Config.MAX_RETRIES,
+    'retry_sleep_functions': {'http': _retry_backoff, 'fragment': _retry_backoff, 'extractor': _retry_backoff}
+}
+
+# Idle YoutubeDL instances. Building one loads every extractor, so they are
+# reused across songs; each download worker takes one out while it runs.
+_YDL_POOL = queue.SimpleQueue()
+_YDL_ALL = []
+
+def _acquire_ydl():
+    try:
+        return _YDL_POOL.get_nowait()
+    except queue.Empty:
+        ydl = yt_dlp.YoutubeDL(dict(BASE_YDL_OPTS))
+        _YDL_ALL.append(ydl)
+        return ydl
+
+@atexit.register
+def _close_ydls():
+    for ydl in _YDL_ALL:
+        ydl.close()
+
 def download_song(track_name: str, artists_string: str, song_id: str, output_folder: str) -> bool:
     """Download a song using yt-dlp"""
     try:
-        import yt_dlp
-        
         # Create output folder if it doesn't exist
         os.makedirs(output_folder, exist_ok=True)
         
         # Create search query
         search_query = f"{track_name} {artists_string}"
         
-        # Configure yt-dlp options for MP3 download only
-        ydl_opts = {
-            'format': 'bestaudio/best',
-            'outtmpl': os.path.join(output_folder, f'{song_id}.%(ext)s'),
-            'extractaudio': True,
-            'audioformat': 'mp3',
-            'audioquality': Config.AUDIO_QUALITY,
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': Config.AUDIO_QUALITY,
-            }],
-            'quiet': True,
-            'no_warnings': True
-        }
-        
         print(f"   🔍 Searching for: {search_query}")
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        ydl = _acquire_ydl()
+        try:
+            ydl.params['outtmpl'] = {'default': os.path.join(output_folder, f'{song_id}.%(ext)s')}
+            
             # Search for the song
             info = ydl.extract_info(f"ytsearch1:{search_query}", download=True)
-            
-            if info and 'entries' in info and len(info['entries']) > 0:
-                entry = info['entries'][0]
-                print(f"   ✅ Downloaded: {entry.get('title', 'Unknown')}")
-                return True
-            else:
-                print(f"   ❌ No results found for: {search_query}")
-                return False
+        finally:
+            _YDL_POOL.put(ydl)
+        
+        if info and 'entries' in info and len(info['entries']) > 0:
+            entry = info['entries'][0]
+            print(f"   ✅ Downloaded: {entry.get('title', 'Unknown')}")
+            return True
+        else:
+            print(f"   ❌ No results found for: {search_query}")
+            return False
                 
     except Exception as e:
         print(f"   ❌ Download failed for {track_name}: {e}")
         return False
 
+class SongMetadata(NamedTuple):
+    track_name: str
+    artists_string: str
+    album_name: str
+    duration_formatted: str
+
 # === MAIN FUNCTIONS ===
 class PlaylistSongDownloader:
     def __init__(self):
         self.songs_db = {}
         self.playlists_db = {}
         self.mapping_db = {}
+        self.playlist_index = {}  # lowercased playlist name -> song IDs
+        self._songs_on_disk: Optional[Set[str]] = None  # song IDs with an mp3 in SONGS_FOLDER
+        self._meta_cache: Dict[str, SongMetadata] = {}
+        self._song_path_prefix = os.path.join(Config.SONGS_FOLDER, '')  # joined once, songs are a flat folder
         self.load_databases()
     
     def load_databases(self):
@@ -185,55 +236,82 @@ class PlaylistSongDownloader:
         self.mapping_db = load_json_file(Config.MAPPING_DB_FILE)
         mapping_count = len(self.mapping_db.get('mapping', {}))
         print(f"   🔗 Mapping database: {mapping_count} song mappings")
+        
+        # Invert the mapping once so playlist lookups don't scan every song
+        playlist_index = defaultdict(list)
+        for song_id, playlists in self.mapping_db.get('mapping', {}).items():
+            for playlist in {p.lower() for p in playlists}:
+                playlist_index[playlist].append(song_id)
+        self.playlist_index = dict(playlist_index)
+        self._meta_cache = {}
     
     def find_playlist_songs(self, playlist_name: str) -> List[str]:
         """Find all song IDs for a given playlist name"""
         print(f"🔍 Searching for playlist: '{playlist_name}'")
         
-        song_ids = []
-        mapping = self.mapping_db.get('mapping', {})
-        
-        # Search through all song mappings
-        for song_id, playlists in mapping.items():
-            if playlist_name.lower() in [p.lower() for p in playlists]:
-                song_ids.append(song_id)
+        song_ids = list(self.playlist_index.get(playlist_name.lower(), []))
         
         print(f"   📝 Found {len(song_ids)} songs in playlist '{playlist_name}'")
         return song_ids
     
+    def _refresh_disk_index(self):
+        """List the songs folder once instead of stat()-ing every song file"""
+        try:
+            with os.scandir(Config.SONGS_FOLDER) as entries:
+                self._songs_on_disk = {entry.name[:-4] for entry in entries
+                                       if entry.name.endswith('.mp3') and entry.is_file()}
+        except FileNotFoundError:
+            self._songs_on_disk = set()
+    
     def check_local_files(self, song_ids: List[str]) -> Tuple[List[str], List[str]]:
         """Check which songs exist locally and which are missing"""
-        existing_songs = []
-        missing_songs = []
-        
         print("🔍 Checking local files...")
         
-        for song_id in song_ids:
-            file_path = os.path.join(Config.SONGS_FOLDER, f"{song_id}.mp3")
-            if os.path.exists(file_path):
-                existing_songs.append(song_id)
-            else:
-                missing_songs.append(song_id)
+        self._refresh_disk_index()
+        existing_songs = [song_id for song_id in song_ids if song_id in self._songs_on_disk]
+        missing_songs = [song_id for song_id in song_ids if song_id not in self._songs_on_disk]
         
         print(f"   ✅ Existing songs: {len(existing_songs)}")
         print(f"   ❌ Missing songs: {len(missing_songs)}")
         
         return existing_songs, missing_songs
     
-    def get_song_metadata(self, song_id: str) -> Optional[dict]:
-        """Get song metadata from the songs database"""
-        songs = self.songs_db.get('songs', {})
-        song_info = songs.get(song_id)
-        
-        if song_info:
-            metadata = song_info.get('metadata', {})
-            return {
-                'track_name': metadata.get('track_name', 'Unknown Track'),
-                'artists_string': metadata.get('artists_string', 'Unknown Artist'),
-                'album_name': metadata.get('album_name', 'Unknown Album'),
-                'duration_formatted': metadata.get('duration_formatted', '0:00')
-            }
-        return None
+    def get_song_metadata(self, song_id: str) -> Optional[SongMetadata]:
+        """Get song metadata from the songs database (memoized per song)"""
+        cached = self._meta_cache.get(song_id)
+        if cached:
+            return cached
+        
+        song_info = self.songs_db.get('songs', {}).get(song_id)
+        if not song_info:
+            return None
+        
+        metadata = song_info.get('metadata', {})
+        cached = self._meta_cache[song_id] = SongMetadata(
+            metadata.get('track_name', 'Unknown Track'),
+            metadata.get('artists_string', 'Unknown Artist'),
+            metadata.get('album_name', 'Unknown Album'),
+            metadata.get('duration_formatted', '0:00')
+        )
+        return cached
+    
+    def _download_one(self, index: int, total: int, song_id: str) -> Tuple[str, Optional[bool]]:
+        """Download a single song, returns (song_id, success) with success None if it has no metadata"""
+        print(f"\n📥 [{index}/{total}] Processing: {song_id}")
+        
+        # Get song metadata
+        metadata = self.get_song_metadata(song_id)
+        
+        if not metadata:
+            print(f"   ❌ No metadata found for {song_id}")
+            return song_id, None
+        
+        track_name = metadata.track_name
+        artists_string = metadata.artists_string
+        
+        print(f"   🎵 {track_name} by {artists_string}")
+        
+        return song_id, download_song(track_name, artists_string, song_id, Config.SONGS_FOLDER)
     
     def download_missing_songs(self, missing_song_ids: List[str]) -> int:
         """Download all missing songs"""
@@ -244,33 +322,21 @@ class PlaylistSongDownloader:
         print(f"🎵 Starting download of {len(missing_song_ids)} missing songs...")
         successful_downloads = 0
         
-        for i, song_id in enumerate(missing_song_ids, 1):
-            print(f"\n📥 [{i}/{len(missing_song_ids)}] Processing: {song_id}")
-            
-            # Get song metadata
-            metadata = self.get_song_metadata(song_id)
-            
-            if not metadata:
-                print(f"   ❌ No metadata found for {song_id}")
-                continue
-            
-            track_name = metadata['track_name']
-            artists_string = metadata['artists_string']
-            
-            print(f"   🎵 {track_name} by {artists_string}")
-            
-            # Attempt download
-            if download_song(track_name, artists_string, song_id, Config.SONGS_FOLDER):
-                successful_downloads += 1
+        # Downloads run on worker threads; the songs database is only updated
+        # here, on the calling thread, as each download finishes
+        with ThreadPoolExecutor(max_workers=Config.DOWNLOAD_WORKERS) as executor:
+            futures = [
+                executor.submit(self._download_one, i, len(missing_song_ids), song_id)
+                for i, song_id in enumerate(missing_song_ids, 1)
+            ]
+            for future in as_completed(futures):
+                song_id, success = future.result()
+                if success is None:
+                    continue  # No metadata, nothing to record
                 
-                # Update song database with download info
-                self.update_song_download_status(song_id, True)
-            else:
-                # Mark as failed
-                self.update_song_download_status(song_id, False)
-            
-            # Small delay between downloads
-            time.sleep(Config.DOWNLOAD_DELAY)
+                if success:
+                    successful_downloads += 1
+                self.update_song_download_status(song_id, success)
         
         print(f"\n📊 Download Summary:")
         print(f"   ✅ Successful: {successful_downloads}")
@@ -287,11 +353,12 @@ class PlaylistSongDownloader:
             
             songs[song_id]['download_info'].update({
                 'status': 'completed' if success else 'failed',
-                'file_path': os.path.join(Config.SONGS_FOLDER, f"{song_id}.mp3") if success else None,
+                'file_path': f"{self._song_path_prefix}{song_id}.mp3" if success else None,
                 'downloaded_at': datetime.now().isoformat() if success else None
             })
     
-    def update_playlist_database(self, playlist_name: str, song_ids: List[str], successful_downloads: int):
+    def update_playlist_database(self, playlist_name: str, song_ids: List[str],
+                                 existing_songs: List[str], successful_downloads: int):
         """Update or create playlist entry in playlists database"""
         print(f"💾 Updating playlist database for '{playlist_name}'...")
         
@@ -299,12 +366,8 @@ class PlaylistSongDownloader:
         playlists = self.playlists_db.get('playlists', {})
         playlist_key = playlist_name.lower().replace(' ', '').replace('-', '')
         
-        # Count existing successful downloads
-        existing_successful = 0
-        for song_id in song_ids:
-            file_path = os.path.join(Config.SONGS_FOLDER, f"{song_id}.mp3")
-            if os.path.exists(file_path):
-                existing_successful += 1
+        # Songs already on disk before this run plus the ones just downloaded
+        existing_successful = len(existing_songs) + successful_downloads
         
         # Create or update playlist entry
         playlist_entry = {
@@ -380,7 +443,7 @@ class PlaylistSongDownloader:
             successful_downloads = self.download_missing_songs(missing_songs)
         
         # Update playlist database
-        self.update_playlist_database(playlist_name, song_ids, successful_downloads)
+        self.update_playlist_database(playlist_name, song_ids, existing_songs, successful_downloads)
         
         # Save all databases
         self.save_databases()
@@ -1,9 +1,100 @@
 import json
 import os
 import shutil
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Set, Optional
+from typing import Dict, List, NamedTuple, Set, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Audio file extensions, in the order a song's file is looked for
+AUDIO_EXTENSIONS = ('.mp3', '.m4a', '.flac', '.wav', '.ogg')
+
+# Deleting at least this fraction of a dict's keys rebuilds it in one pass
+# instead of deleting key by key
+REBUILD_FRACTION = 0.25
+
+class SongAction(NamedTuple):
+    action: str  # 'remove' or 'keep'
+    metadata: dict  # The song's metadata, kept for the removal preview
+
+def _without_keys(table: dict, keys: List[str]) -> tuple:
+    """Drop keys from a dict, returns (resulting dict, number of keys dropped)"""
+    drop = set(keys)
+    if len(drop) >= len(table) * REBUILD_FRACTION:
+        kept = {key: value for key, value in table.items() if key not in drop}
+        return kept, len(table) - len(kept)
+    
+    # A few keys out of many: deleting them is cheaper than copying the rest
+    removed = 0
+    for key in drop:
+        if table.pop(key, None) is not None:
+            removed += 1
+    return table, removed
+
+def _snapshot_path(path: Path) -> Path:
+    """Binary msgpack copy kept next to a JSON database (e.g. songs_database.msgpack)"""
+    return path.with_suffix('.msgpack')
+
+def _source_stamp(path: Path) -> list:
+    """Size and nanosecond mtime of a JSON database, recorded in its snapshot"""
+    st = path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+def load_json_file(path: Path) -> dict:
+    """Parse a database file straight from its UTF-8 bytes (read in one call)"""
+    # The msgpack snapshot decodes faster, but only counts if it was taken of
+    # exactly this JSON file: other tools (and restores with cp -p, rsync or git)
+    # replace the JSON without touching it, and may leave an older mtime behind
+    snapshot = _snapshot_path(path)
+    if msgpack and snapshot.exists():
+        try:
+            raw = snapshot.read_bytes()
+            unpacker = msgpack.Unpacker(raw=False, max_buffer_size=len(raw))
+            unpacker.feed(raw)
+            if next(unpacker) == _source_stamp(path):
+                return next(unpacker)
+        except Exception as e:
+            print(f"⚠️  Ignoring unreadable snapshot {snapshot.name}: {e}")
+    
+    raw = path.read_bytes()
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+def _write_atomic(path: Path, payload: bytes):
+    tmp_path = path.with_name(path.name + '.tmp')
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+
+def encode_json(data) -> bytes:
+    """Compact UTF-8 JSON; no indentation on disk, `--pretty` prints a readable copy when needed"""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def save_json_file(path: Path, data: dict, payload: Optional[bytes] = None):
+    """Encode the whole document (unless already encoded), write it straight to the fd, then swap it in atomically"""
+    _write_atomic(path, encode_json(data) if payload is None else payload)
+    
+    # Stamped with the JSON just written, so any later change to the JSON invalidates it
+    if msgpack:
+        _write_atomic(_snapshot_path(path), msgpack.packb(_source_stamp(path)) + msgpack.packb(data, use_bin_type=True))
 
 class PlaylistRemover:
     def __init__(self, consolidated_folder: str = "consolidated_music"):
@@ -17,47 +108,50 @@ class PlaylistRemover:
         self.artists_db_path = self.metadata_folder / 'artists_database.json'
         self.mapping_db_path = self.metadata_folder / 'song_playlist_mapping.json'
         
-        # Data containers
-        self.songs_db = {}
+        # Data containers (songs, artists and mapping load on first use)
+        self._songs_db: Optional[dict] = None
         self.playlists_db = {}
-        self.artists_db = {}
-        self.mapping_db = {}
+        self._artists_db: Optional[dict] = None
+        self._mapping_db: Optional[dict] = None
+        self._playlist_to_artists: Optional[Dict[str, List[str]]] = None  # playlist ID -> artist URIs, inverted from the artists database
+        self._song_files: Optional[Dict[str, str]] = None  # song ID -> path of its audio file, from one folder scan
+        self._playlist_name_lower: Dict[str, str] = {}  # playlist ID -> lowercased name
+        self._playlist_by_exact_name: Dict[str, List[str]] = {}  # lowercased name -> playlist IDs
+        self._encoded_playlists: Dict[str, bytes] = {}  # playlist ID -> its encoded '"id":{...}' member, reused across saves
+        
+        # Timestamp shared by everything one user operation writes (None outside one)
+        self._batch_ts: Optional[str] = None
+        
+        # Databases changed since the last save; only these get rewritten
+        self._dirty = {'songs': False, 'playlists': False, 'artists': False, 'mapping': False}
         
         # Load existing databases
-        self.load_databases()
+        self.databases_found = self.load_databases()
     
     def load_databases(self):
-        """Load all existing databases"""
+        """Load the playlists database; the rest load on first use"""
         try:
-            # Load songs database
-            if self.songs_db_path.exists():
-                with open(self.songs_db_path, 'r', encoding='utf-8') as f:
-                    self.songs_db = json.load(f)
-                print(f"📚 Loaded songs database: {len(self.songs_db.get('songs', {}))} songs")
-            else:
+            # Songs database (loaded lazily, listing playlists never needs it)
+            if not self.songs_db_path.exists():
                 print("❌ Songs database not found")
                 return False
             
             # Load playlists database
             if self.playlists_db_path.exists():
-                with open(self.playlists_db_path, 'r', encoding='utf-8') as f:
-                    self.playlists_db = json.load(f)
+                self.playlists_db = load_json_file(self.playlists_db_path)
                 print(f"📚 Loaded playlists database: {len(self.playlists_db.get('playlists', {}))} playlists")
             else:
                 print("❌ Playlists database not found")
                 return False
             
-            # Load artists database
-            if self.artists_db_path.exists():
-                with open(self.artists_db_path, 'r', encoding='utf-8') as f:
-                    self.artists_db = json.load(f)
-                print(f"📚 Loaded artists database: {len(self.artists_db.get('artists', {}))} artists")
-            
-            # Load mapping database
-            if self.mapping_db_path.exists():
-                with open(self.mapping_db_path, 'r', encoding='utf-8') as f:
-                    self.mapping_db = json.load(f)
-                print(f"📚 Loaded mapping database")
+            # Lowercase every playlist name once instead of on each search
+            self._playlist_name_lower = {}
+            self._encoded_playlists = {}
+            self._playlist_by_exact_name = defaultdict(list)
+            for playlist_id, playlist_info in self.playlists_db.get('playlists', {}).items():
+                name_lower = playlist_info.get('name', '').lower()
+                self._playlist_name_lower[playlist_id] = name_lower
+                self._playlist_by_exact_name[name_lower].append(playlist_id)
             
             return True
             
@@ -65,38 +159,105 @@ class PlaylistRemover:
             print(f"❌ Error loading databases: {e}")
             return False
     
+    def _now_iso(self) -> str:
+        """The current operation's timestamp, or a fresh one outside an operation"""
+        return self._batch_ts or datetime.now().isoformat()
+    
+    @property
+    def songs_db(self) -> dict:
+        if self._songs_db is None:
+            self._songs_db = load_json_file(self.songs_db_path)
+            print(f"📚 Loaded songs database: {len(self._songs_db.get('songs', {}))} songs")
+        return self._songs_db
+    
+    @property
+    def artists_db(self) -> dict:
+        if self._artists_db is None:
+            self._artists_db = {}
+            if self.artists_db_path.exists():
+                self._artists_db = load_json_file(self.artists_db_path)
+                print(f"📚 Loaded artists database: {len(self._artists_db.get('artists', {}))} artists")
+        return self._artists_db
+    
+    @property
+    def playlist_to_artists(self) -> Dict[str, List[str]]:
+        if self._playlist_to_artists is None:
+            # Invert artist -> playlists once so a removal only visits its own artists
+            playlist_to_artists = defaultdict(list)
+            for artist_uri, artist_info in self.artists_db.get('artists', {}).items():
+                for playlist_id in artist_info.get('playlist_ids', []):
+                    playlist_to_artists[playlist_id].append(artist_uri)
+            self._playlist_to_artists = dict(playlist_to_artists)
+        return self._playlist_to_artists
+    
+    @property
+    def mapping_db(self) -> dict:
+        if self._mapping_db is None:
+            self._mapping_db = {}
+            if self.mapping_db_path.exists():
+                self._mapping_db = load_json_file(self.mapping_db_path)
+                print(f"📚 Loaded mapping database")
+        return self._mapping_db
+    
+    def _encode_playlists_db(self) -> bytes:
+        """Encode the playlists database, re-encoding only playlists not encoded by an earlier save"""
+        # Playlists are only ever deleted here, never edited, so a cached entry stays valid
+        parts = []
+        for key, value in self.playlists_db.items():
+            if key != 'playlists':
+                parts.append(encode_json(key) + b':' + encode_json(value))
+                continue
+            
+            members = []
+            for playlist_id, playlist_info in value.items():
+                member = self._encoded_playlists.get(playlist_id)
+                if member is None:
+                    member = encode_json(playlist_id) + b':' + encode_json(playlist_info)
+                    self._encoded_playlists[playlist_id] = member
+                members.append(member)
+            parts.append(b'"playlists":{' + b','.join(members) + b'}')
+        return b'{' + b','.join(parts) + b'}'
+    
     def save_databases(self):
         """Save all databases back to files"""
         try:
             # Update timestamps
-            current_time = datetime.now().isoformat()
+            current_time = self._now_iso()
+            to_save = {}  # database name -> (path, data, payload or None to encode while saving)
             
-            # Save songs database
-            self.songs_db['last_updated'] = current_time
-            self.songs_db['total_songs'] = len(self.songs_db.get('songs', {}))
-            with open(self.songs_db_path, 'w', encoding='utf-8') as f:
-                json.dump(self.songs_db, f, indent=2, ensure_ascii=False)
+            # Songs database
+            if self._dirty['songs']:
+                self.songs_db['last_updated'] = current_time
+                self.songs_db['total_songs'] = len(self.songs_db.get('songs', {}))
+                to_save['songs'] = (self.songs_db_path, self.songs_db, None)
             
-            # Save playlists database
-            self.playlists_db['last_updated'] = current_time
-            self.playlists_db['total_playlists'] = len(self.playlists_db.get('playlists', {}))
-            with open(self.playlists_db_path, 'w', encoding='utf-8') as f:
-                json.dump(self.playlists_db, f, indent=2, ensure_ascii=False)
+            # Playlists database
+            if self._dirty['playlists']:
+                self.playlists_db['last_updated'] = current_time
+                self.playlists_db['total_playlists'] = len(self.playlists_db.get('playlists', {}))
+                to_save['playlists'] = (self.playlists_db_path, self.playlists_db, self._encode_playlists_db())
             
-            # Save artists database
-            if self.artists_db:
+            # Artists database
+            if self._dirty['artists'] and self.artists_db:
                 self.artists_db['last_updated'] = current_time
                 self.artists_db['total_artists'] = len(self.artists_db.get('artists', {}))
-                with open(self.artists_db_path, 'w', encoding='utf-8') as f:
-                    json.dump(self.artists_db, f, indent=2, ensure_ascii=False)
+                to_save['artists'] = (self.artists_db_path, self.artists_db, None)
             
-            # Save mapping database
-            if self.mapping_db:
+            # Mapping database
+            if self._dirty['mapping'] and self.mapping_db:
                 self.mapping_db['last_updated'] = current_time
-                with open(self.mapping_db_path, 'w', encoding='utf-8') as f:
-                    json.dump(self.mapping_db, f, indent=2, ensure_ascii=False)
+                to_save['mapping'] = (self.mapping_db_path, self.mapping_db, None)
+            
+            # The files are independent, so they are written concurrently
+            if to_save:
+                with ThreadPoolExecutor(max_workers=len(to_save)) as executor:
+                    futures = {name: executor.submit(save_json_file, path, data, payload)
+                               for name, (path, data, payload) in to_save.items()}
+                for name, future in futures.items():
+                    future.result()  # Re-raises a failed write
+                    self._dirty[name] = False
             
-            print("💾 All databases saved successfully")
+            print("💾 All changed databases saved successfully")
             return True
             
         except Exception as e:
@@ -106,14 +267,18 @@ class PlaylistRemover:
     def find_playlist_by_name(self, playlist_name: str) -> Optional[str]:
         """Find playlist ID by name (case-insensitive partial match)"""
         playlists = self.playlists_db.get('playlists', {})
-        matches = []
+        search_name = playlist_name.lower()
         
-        for playlist_id, playlist_info in playlists.items():
-            stored_name = playlist_info.get('name', '').lower()
-            search_name = playlist_name.lower()
-            
-            if search_name in stored_name or stored_name in search_name:
-                matches.append((playlist_id, playlist_info.get('name', 'Unknown')))
+        # The full name typed exactly picks that playlist without a prompt
+        exact = self._playlist_by_exact_name.get(search_name, [])
+        if len(exact) == 1:
+            return exact[0]
+        
+        matches = [
+            (playlist_id, playlists[playlist_id].get('name', 'Unknown'))
+            for playlist_id, stored_name in self._playlist_name_lower.items()
+            if search_name in stored_name or stored_name in search_name
+        ]
         
         if not matches:
             return None
@@ -144,49 +309,72 @@ class PlaylistRemover:
         playlist_info = self.playlists_db.get('playlists', {}).get(playlist_id, {})
         return playlist_info.get('song_ids', [])
     
-    def remove_playlist_from_songs(self, playlist_id: str, song_ids: List[str]) -> Dict[str, str]:
+    def remove_playlist_from_songs(self, playlist_id: str, song_ids: List[str]) -> Dict[str, SongAction]:
         """
         Remove playlist ID from songs and determine which songs should be deleted
-        Returns dict: song_id -> action ('remove' or 'keep')
+        Returns dict: song_id -> SongAction(action 'remove' or 'keep', song metadata)
         """
         songs = self.songs_db.get('songs', {})
         song_actions = {}
         
         for song_id in song_ids:
-            if song_id in songs:
-                song_playlists = songs[song_id].get('playlists', [])
+            entry = songs.get(song_id)
+            if entry is not None:
+                song_playlists = entry.setdefault('playlists', [])
                 
-                # Remove this playlist from the song's playlist list
-                if playlist_id in song_playlists:
+                # Remove this playlist from the song's own playlist list in place
+                # (one scan; the song almost always lists it)
+                try:
                     song_playlists.remove(playlist_id)
-                    songs[song_id]['playlists'] = song_playlists
+                    self._dirty['songs'] = True
+                except ValueError:
+                    pass
                 
                 # Determine action based on remaining playlists
-                if not song_playlists:  # No more playlists
-                    song_actions[song_id] = 'remove'
-                else:
-                    song_actions[song_id] = 'keep'
+                action = 'remove' if not song_playlists else 'keep'  # No more playlists -> remove
+                song_actions[song_id] = SongAction(action, entry.get('metadata', {}))
             else:
                 print(f"⚠️  Warning: Song {song_id} not found in database")
         
         return song_actions
     
+    @property
+    def song_files(self) -> Dict[str, str]:
+        if self._song_files is None:
+            # One directory listing instead of probing every extension per song;
+            # keep the highest-priority audio file for each song
+            ext_rank = {ext: rank for rank, ext in enumerate(AUDIO_EXTENSIONS)}
+            best = {}
+            try:
+                with os.scandir(self.songs_folder) as entries:
+                    for entry in entries:
+                        stem, ext = os.path.splitext(entry.name)
+                        if ext in ext_rank and entry.is_file():
+                            current = best.get(stem)
+                            if current is None or ext_rank[ext] < ext_rank[current[0]]:
+                                best[stem] = (ext, entry.path)
+            except FileNotFoundError:
+                pass
+            self._song_files = {stem: path for stem, (ext, path) in best.items()}
+        return self._song_files
+    
     def remove_songs_from_filesystem(self, songs_to_remove: List[str]) -> int:
         """Remove song files from the filesystem"""
         removed_count = 0
         
         for song_id in songs_to_remove:
-            # Find and remove the actual audio file
-            for ext in ['.mp3', '.m4a', '.flac', '.wav', '.ogg']:
-                song_file = self.songs_folder / f"{song_id}{ext}"
-                if song_file.exists():
-                    try:
-                        song_file.unlink()
-                        removed_count += 1
-                        print(f"   🗑️  Deleted: {song_file.name}")
-                        break
-                    except Exception as e:
-                        print(f"   ❌ Failed to delete {song_file.name}: {e}")
+            path = self.song_files.pop(song_id, None)
+            if path is None:
+                continue
+            
+            # Remove the actual audio file
+            song_file = Path(path)
+            try:
+                song_file.unlink()
+                removed_count += 1
+                print(f"   🗑️  Deleted: {song_file.name}")
+            except Exception as e:
+                print(f"   ❌ Failed to delete {song_file.name}: {e}")
         
         return removed_count
     
@@ -197,14 +385,20 @@ class PlaylistRemover:
         
         artists = self.artists_db.get('artists', {})
         artists_to_remove = []
+        now_iso = self._now_iso()  # One timestamp for every artist touched
         
-        for artist_uri, artist_info in artists.items():
+        # Artists listing this playlist (the index entry goes away with the playlist)
+        for artist_uri in self.playlist_to_artists.pop(playlist_id, []):
+            artist_info = artists.get(artist_uri)
+            if artist_info is None:
+                continue
             playlist_ids = artist_info.get('playlist_ids', [])
             
             if playlist_id in playlist_ids:
                 playlist_ids.remove(playlist_id)
                 artist_info['playlist_ids'] = playlist_ids
-                artist_info['last_updated'] = datetime.now().isoformat()
+                self._dirty['artists'] = True
+                artist_info['last_updated'] = now_iso
                 
                 # If artist has no more playlists, mark for removal
                 if not playlist_ids:
@@ -220,15 +414,37 @@ class PlaylistRemover:
         if not self.mapping_db:
             return
         
-        mapping = self.mapping_db.get('mapping', {})
-        
         # Remove songs that are being deleted
-        for song_id in songs_to_remove:
-            if song_id in mapping:
-                del mapping[song_id]
+        mapping, removed = _without_keys(self.mapping_db.get('mapping', {}), songs_to_remove)
+        if removed:
+            self._dirty['mapping'] = True
         
         self.mapping_db['mapping'] = mapping
     
+    def _drop_playlist(self, playlist_id: str, songs_to_remove: List[str]) -> bool:
+        """Remove the playlist entry and its orphaned songs from every database, returns True if the playlist existed"""
+        playlists = self.playlists_db.get('playlists', {})
+        existed = playlist_id in playlists
+        if existed:
+            del playlists[playlist_id]
+            self._encoded_playlists.pop(playlist_id, None)
+            name_lower = self._playlist_name_lower.pop(playlist_id, None)
+            if playlist_id in self._playlist_by_exact_name.get(name_lower, []):
+                self._playlist_by_exact_name[name_lower].remove(playlist_id)
+            self._dirty['playlists'] = True
+        
+        if 'songs' in self.songs_db:
+            self.songs_db['songs'], removed = _without_keys(self.songs_db['songs'], songs_to_remove)
+            if removed:
+                self._dirty['songs'] = True
+        
+        # Clean artists database
+        self.clean_artists_database(playlist_id)
+        
+        # Update mapping database
+        self.update_mapping_database(songs_to_remove)
+        return existed
+    
     def remove_playlist(self, playlist_name: str, confirm: bool = True) -> bool:
         """
         Remove a playlist and handle associated songs
@@ -258,8 +474,9 @@ class PlaylistRemover:
         
         # Analyze song removal impact
         song_actions = self.remove_playlist_from_songs(playlist_id, song_ids)
-        songs_to_remove = [sid for sid, action in song_actions.items() if action == 'remove']
-        songs_to_keep = [sid for sid, action in song_actions.items() if action == 'keep']
+        songs_to_remove, songs_to_keep = [], []
+        for song_id, song in song_actions.items():
+            (songs_to_remove if song.action == 'remove' else songs_to_keep).append(song_id)
         
         print(f"\n📋 Impact Analysis:")
         print(f"   🗑️  Songs to be deleted (not in other playlists): {len(songs_to_remove)}")
@@ -267,13 +484,11 @@ class PlaylistRemover:
         
         if songs_to_remove:
             print(f"\n🎵 Songs that will be completely removed:")
-            songs_db = self.songs_db.get('songs', {})
             for song_id in songs_to_remove[:10]:  # Show first 10
-                if song_id in songs_db:
-                    metadata = songs_db[song_id].get('metadata', {})
-                    track_name = metadata.get('track_name', 'Unknown')
-                    artists = metadata.get('artists_string', 'Unknown Artist')
-                    print(f"   • {track_name} by {artists}")
+                metadata = song_actions[song_id].metadata
+                track_name = metadata.get('track_name', 'Unknown')
+                artists = metadata.get('artists_string', 'Unknown Artist')
+                print(f"   • {track_name} by {artists}")
             
             if len(songs_to_remove) > 10:
                 print(f"   ... and {len(songs_to_remove) - 10} more songs")
@@ -292,31 +507,19 @@ class PlaylistRemover:
         
         # Perform removal
         print(f"\n🗑️  Removing playlist '{actual_name}'...")
+        self._batch_ts = datetime.now().isoformat()
         
         try:
-            # Remove playlist from playlists database
-            playlists = self.playlists_db.get('playlists', {})
-            if playlist_id in playlists:
-                del playlists[playlist_id]
+            # Remove playlist and its orphaned songs from the databases
+            if self._drop_playlist(playlist_id, songs_to_remove):
                 print(f"   ✅ Removed playlist from database")
             
-            # Remove songs from songs database and filesystem
-            songs_db = self.songs_db.get('songs', {})
-            for song_id in songs_to_remove:
-                if song_id in songs_db:
-                    del songs_db[song_id]
-            
+            # Remove song files from the filesystem
             if songs_to_remove:
                 removed_files = self.remove_songs_from_filesystem(songs_to_remove)
                 print(f"   ✅ Removed {removed_files} song files from disk")
                 print(f"   ✅ Removed {len(songs_to_remove)} songs from database")
             
-            # Clean artists database
-            self.clean_artists_database(playlist_id)
-            
-            # Update mapping database
-            self.update_mapping_database(songs_to_remove)
-            
             # Save all databases
             if self.save_databases():
                 print(f"\n✅ Successfully removed playlist '{actual_name}'")
@@ -332,6 +535,8 @@ class PlaylistRemover:
         except Exception as e:
             print(f"❌ Error during removal: {e}")
             return False
+        finally:
+            self._batch_ts = None
     
     def list_all_playlists(self):
         """List all available playlists"""
@@ -346,6 +551,7 @@ class PlaylistRemover:
         
         for i, (playlist_id, playlist_info) in enumerate(playlists.items(), 1):
             name = playlist_info.get('name', 'Unknown')
+            # The playlist's own song list, so listing never loads the songs database
             song_count = len(playlist_info.get('song_ids', []))
             created_at = playlist_info.get('created_at', 'Unknown')
             
@@ -360,8 +566,32 @@ class PlaylistRemover:
             print(f"    🆔 ID: {playlist_id}")
             print()
 
+def print_database(name: str, consolidated_folder: str = "consolidated_music"):
+    """Print one database indented, for reading the compact files on disk"""
+    databases = {
+        'songs': 'songs_database.json',
+        'playlists': 'playlists_database.json',
+        'artists': 'artists_database.json',
+        'mapping': 'song_playlist_mapping.json',
+    }
+    if name not in databases:
+        print(f"❌ Unknown database '{name}'. Choose one of: {', '.join(databases)}")
+        return
+    
+    path = Path(consolidated_folder) / "metadata" / databases[name]
+    if not path.exists():
+        print(f"❌ Database not found: {path}")
+        return
+    
+    print(json.dumps(load_json_file(path), indent=2, ensure_ascii=False))
+
 def main():
     """Main function to run the playlist remover"""
+    # `python remove_playlist.py --pretty songs` prints a database instead of starting the tool
+    if len(sys.argv) > 1 and sys.argv[1] == '--pretty':
+        print_database(sys.argv[2] if len(sys.argv) > 2 else '')
+        return
+    
     print("🗑️  Playlist Remover Tool")
     print("=" * 50)
     print("This tool will remove a playlist and its associated songs from your music database.")
@@ -372,7 +602,7 @@ def main():
     remover = PlaylistRemover()
     
     # Check if databases were loaded successfully
-    if not remover.songs_db or not remover.playlists_db:
+    if not remover.databases_found:
         print("❌ Required databases not found. Make sure you have run the scraper first.")
         return
     
@@ -6,12 +6,34 @@ This tool scans the songs folder, identifies songs that need to be removed,
 and cleans up all associated metadata from the database files.
 """
 
+import argparse
+import heapq
 import json
+import mmap
 import os
 import re
+import shutil
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Set, Optional
+from typing import Dict, List, Set, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import liburing  # Linux only: batches the file deletions through io_uring
+except ImportError:
+    liburing = None
 
 # === CONFIGURATION ===
 class Config:
@@ -25,6 +47,18 @@ class Config:
     PLAYLISTS_DB_FILE = os.path.join(METADATA_FOLDER, "playlists_database.json")
     MAPPING_DB_FILE = os.path.join(METADATA_FOLDER, "song_playlist_mapping.json")
     ARTISTS_DB_FILE = os.path.join(METADATA_FOLDER, "artists_database.json")
+    
+    # Without orjson, files larger than this are parsed as a stream instead of read whole first
+    STREAM_LOAD_BYTES = 64 * 1024 * 1024
+    
+    # Song files deleted in parallel (unlink releases the GIL)
+    DELETE_WORKERS = 8
+    
+    # Unlinks submitted to io_uring per batch (when liburing is installed)
+    URING_ENTRIES = 256
+
+# Command-line --mode values -> removal menu option
+CLI_MODES = {'missing': '1', 'orphaned': '2', 'search': '3', 'playlist': '4'}
 
 # === UTILITY FUNCTIONS ===
 def load_json_file(file_path: str) -> dict:
@@ -34,43 +68,114 @@ def load_json_file(file_path: str) -> dict:
             print(f"❌ File not found: {file_path}")
             return {}
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if orjson and size:
+                # Parsed straight from the memory-mapped file, with no bytes copy of it first
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                    return orjson.loads(view)
+            
+            # A large database is built straight from the stream, so its raw
+            # bytes are never held in memory alongside the parsed dict
+            if ijson and size > Config.STREAM_LOAD_BYTES:
+                return dict(ijson.kvitems(f, '', use_float=True))
+            raw = f.read()
+        return json.loads(raw)
     except Exception as e:
         print(f"❌ Error loading {file_path}: {e}")
         return {}
 
-def save_json_file(file_path: str, data: dict) -> bool:
-    """Save JSON file with error handling"""
+def backup_file(file_path: str) -> str:
+    """Keep the current file as a rolling .bak (a hard link, so nothing is copied) and return its name"""
+    backup_path = f"{file_path}.bak"
+    tmp_path = f"{backup_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(file_path, tmp_path)
+    except OSError:
+        shutil.copy2(file_path, tmp_path)  # Filesystem without hard links
+    os.replace(tmp_path, backup_path)
+    return os.path.basename(backup_path)
+
+def save_json_file(file_path: str, data: dict, backup: bool = False) -> Tuple[bool, Optional[str]]:
+    """Save JSON file with error handling, written to a temp file and swapped in atomically.
+    Returns (saved, backup name) so callers on worker threads can leave the printing to the main thread."""
+    backup_name = None
     try:
-        # Create backup first
-        backup_path = f"{file_path}.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        if os.path.exists(file_path):
-            import shutil
-            shutil.copy2(file_path, backup_path)
-            print(f"📋 Created backup: {os.path.basename(backup_path)}")
-        
-        # Save new data
+        if backup and os.path.exists(file_path):
+            backup_name = backup_file(file_path)
+        
+        # Save new data (the rename leaves the backup link pointing at the old contents)
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        return True
+        if orjson:
+            raw = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        else:
+            raw = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(raw)
+        os.replace(tmp_path, file_path)
+        return True, backup_name
     except Exception as e:
         print(f"❌ Error saving {file_path}: {e}")
-        return False
+        return False, backup_name
 
-def scan_songs_folder() -> List[str]:
-    """Scan songs folder and return list of song files"""
-    if not os.path.exists(Config.SONGS_FOLDER):
+def scan_songs_folder() -> Set[str]:
+    """Scan songs folder once and return the names of every file in it"""
+    try:
+        # One directory listing; DirEntry.is_file() needs no extra stat call
+        with os.scandir(Config.SONGS_FOLDER) as entries:
+            return {entry.name for entry in entries if entry.is_file()}
+    except FileNotFoundError:
         print(f"❌ Songs folder not found: {Config.SONGS_FOLDER}")
-        return []
+        return set()
+
+def try_remove_file(file_path: str) -> Optional[str]:
+    """Delete a file, returns the error message if it could not be deleted"""
+    try:
+        os.remove(file_path)
+        return None
+    except Exception as e:
+        return str(e)
+
+def remove_files_uring(folder: str, filenames: List[str]) -> Optional[List[Optional[str]]]:
+    """Delete files from one folder with batched io_uring unlinks, returns an error message
+    (or None) per file, or None if io_uring can't be used here"""
+    ring = liburing.Ring()
+    try:
+        liburing.io_uring_queue_init(Config.URING_ENTRIES, ring)
+    except OSError:
+        return None  # Kernel without io_uring, or blocked by seccomp
     
-    song_files = []
-    for file in os.listdir(Config.SONGS_FOLDER):
-        if file.endswith('.mp3') and file.startswith('song_'):
-            song_files.append(file)
+    errors: List[Optional[str]] = [None] * len(filenames)
+    dir_fd = os.open(folder, os.O_RDONLY)
+    try:
+        cqe = liburing.Cqe()
+        for start in range(0, len(filenames), Config.URING_ENTRIES):
+            batch = range(start, min(start + Config.URING_ENTRIES, len(filenames)))
+            for index in batch:
+                sqe = liburing.io_uring_get_sqe(ring)
+                liburing.io_uring_prep_unlink(sqe, filenames[index], 0, dir_fd)
+                liburing.io_uring_sqe_set_data64(sqe, index)
+            
+            # One syscall submits the whole batch and waits for it
+            liburing.io_uring_submit_and_wait(ring, len(batch))
+            liburing.io_uring_peek_cqe(ring, cqe)
+            ready = liburing.io_uring_cq_ready(ring)
+            for i in range(ready):
+                completion = cqe[i]
+                index = completion.user_data
+                try:
+                    completion.res  # Raises OSError for a failed unlink
+                except OSError as e:
+                    errors[index] = e.strerror
+            liburing.io_uring_cq_advance(ring, ready)
+    finally:
+        os.close(dir_fd)
+        liburing.io_uring_queue_exit(ring)
     
-    return sorted(song_files)
+    return errors
 
 def extract_song_id_from_filename(filename: str) -> str:
     """Extract song ID from filename (removes .mp3 extension)"""
@@ -78,11 +183,8 @@ def extract_song_id_from_filename(filename: str) -> str:
         return filename[:-4]  # Remove .mp3
     return filename
 
-def get_song_metadata_from_id(song_id: str, songs_db: dict) -> Optional[dict]:
-    """Get song metadata from songs database"""
-    songs = songs_db.get('songs', {})
-    song_info = songs.get(song_id)
-    
+def get_song_metadata(song_info: Optional[dict]) -> Optional[dict]:
+    """Get song metadata from a songs database entry (already looked up by the caller)"""
     if song_info:
         metadata = song_info.get('metadata', {})
         return {
@@ -94,17 +196,31 @@ def get_song_metadata_from_id(song_id: str, songs_db: dict) -> Optional[dict]:
         }
     return None
 
+def get_search_text(metadata: Optional[dict]) -> Optional[str]:
+    """Lowercased track name and artists, joined once so a search is one substring test per song"""
+    if not metadata:
+        return None
+    # input() never returns a newline, so a search term can't match across the two fields
+    return f"{metadata['track_name']}\n{metadata['artists_string']}".lower()
+
 # === MAIN CLEANUP CLASS ===
 class SongCleanupTool:
     def __init__(self):
         self.songs_db = {}
         self.playlists_db = {}
         self.mapping_db = {}
-        self.artists_db = {}
+        self._artists_db: Optional[dict] = None  # Loaded on first use; cleanup never reads it
+        
+        # Databases changed since loading; only these get written (and backed up)
+        self._dirty = {'songs': False, 'playlists': False, 'mapping': False, 'artists': False}
+        
+        # playlist key -> scanned songs listing it, filled by scan_and_identify_songs
+        self._playlist_index: Dict[str, List[dict]] = {}
+        
         self.load_databases()
     
     def load_databases(self):
-        """Load all required databases"""
+        """Load the databases cleanup reads (the artists database loads on first use)"""
         print("📚 Loading databases...")
         
         self.songs_db = load_json_file(Config.SONGS_DB_FILE)
@@ -118,53 +234,68 @@ class SongCleanupTool:
         self.mapping_db = load_json_file(Config.MAPPING_DB_FILE)
         mapping_count = len(self.mapping_db.get('mapping', {}))
         print(f"   🔗 Mapping database: {mapping_count} song mappings")
-        
-        self.artists_db = load_json_file(Config.ARTISTS_DB_FILE)
-        artists_count = len(self.artists_db.get('artists', {}))
-        print(f"   🎤 Artists database: {artists_count} artists")
+    
+    @property
+    def artists_db(self) -> dict:
+        if self._artists_db is None:
+            self._artists_db = load_json_file(Config.ARTISTS_DB_FILE)
+            print(f"   🎤 Artists database: {len(self._artists_db.get('artists', {}))} artists")
+        return self._artists_db
     
     def scan_and_identify_songs(self) -> List[dict]:
         """Scan songs folder and identify all songs with their metadata"""
         print("\n🔍 Scanning songs folder...")
         
-        song_files = scan_songs_folder()
+        folder_files = scan_songs_folder()
+        song_files = [f for f in folder_files if f[-4:] == '.mp3' and f[:5] == 'song_']  # Slice compares, no method calls
         print(f"   📁 Found {len(song_files)} song files in folder")
         
         identified_songs = []
+        songs_in_db = self.songs_db.get('songs', {})
+        folder_prefix = Config.SONGS_FOLDER + os.sep  # Paths are built by concatenation, not os.path.join per song
         
         for filename in song_files:
             song_id = extract_song_id_from_filename(filename)
-            metadata = get_song_metadata_from_id(song_id, self.songs_db)
+            metadata = get_song_metadata(songs_in_db.get(song_id))
             
             song_info = {
                 'filename': filename,
                 'song_id': song_id,
-                'file_path': os.path.join(Config.SONGS_FOLDER, filename),
+                'file_path': folder_prefix + filename,
                 'file_exists': True,
                 'in_database': metadata is not None,
-                'metadata': metadata
+                'metadata': metadata,
+                'search_text': get_search_text(metadata)
             }
             
             identified_songs.append(song_info)
         
-        # Also check for songs in database but not in folder
-        songs_in_db = self.songs_db.get('songs', {})
-        for song_id in songs_in_db:
+        # Also check for songs in database but not in folder (set lookups, no stat per song)
+        for song_id, db_entry in songs_in_db.items():
             expected_filename = f"{song_id}.mp3"
-            expected_path = os.path.join(Config.SONGS_FOLDER, expected_filename)
             
-            if not os.path.exists(expected_path):
-                metadata = get_song_metadata_from_id(song_id, self.songs_db)
+            if expected_filename not in folder_files:
+                expected_path = folder_prefix + expected_filename
+                metadata = get_song_metadata(db_entry)
                 song_info = {
                     'filename': expected_filename,
                     'song_id': song_id,
                     'file_path': expected_path,
                     'file_exists': False,
                     'in_database': True,
-                    'metadata': metadata
+                    'metadata': metadata,
+                    'search_text': get_search_text(metadata)
                 }
                 identified_songs.append(song_info)
         
+        # Index the scanned songs by playlist once, for selecting a playlist's songs
+        playlist_index = defaultdict(list)
+        for song_info in identified_songs:
+            if song_info['metadata']:
+                for playlist_key in set(song_info['metadata'].get('playlists', [])):
+                    playlist_index[playlist_key].append(song_info)
+        self._playlist_index = dict(playlist_index)
+        
         return identified_songs
     
     def display_songs_summary(self, songs: List[dict]):
@@ -194,11 +325,15 @@ class SongCleanupTool:
             for song in not_in_database[:5]:
                 print(f"   - {song['filename']} ({song['song_id']})")
     
-    def select_songs_for_removal(self, songs: List[dict]) -> List[dict]:
-        """Interactive song selection for removal"""
+    def select_songs_for_removal(self, songs: List[dict], choice: Optional[str] = None,
+                                 search_term: Optional[str] = None, playlist: Optional[str] = None,
+                                 assume_yes: bool = False) -> List[dict]:
+        """Song selection for removal (interactive unless the option was given on the command line)"""
         print(f"\n🎯 Song Selection for Removal")
         print("=" * 50)
         
+        interactive = choice is None
+        
         removal_options = {
             '1': 'Remove files missing from folder (database cleanup)',
             '2': 'Remove files not in database (orphaned files)',
@@ -208,12 +343,16 @@ class SongCleanupTool:
             '6': 'Cancel - don\'t remove anything'
         }
         
-        print("Select removal option:")
-        for key, desc in removal_options.items():
-            print(f"   {key}. {desc}")
+        if interactive:
+            print("Select removal option:")
+            for key, desc in removal_options.items():
+                print(f"   {key}. {desc}")
+        else:
+            print(f"Option {choice}: {removal_options[choice]}")
         
         while True:
-            choice = input("\nEnter your choice (1-6): ").strip()
+            if interactive:
+                choice = input("\nEnter your choice (1-6): ").strip()
             
             if choice == '1':
                 return [s for s in songs if not s['file_exists'] and s['in_database']]
@@ -222,10 +361,10 @@ class SongCleanupTool:
                 return [s for s in songs if s['file_exists'] and not s['in_database']]
             
             elif choice == '3':
-                return self.search_and_select_songs(songs)
+                return self.search_and_select_songs(songs, search_term, assume_yes)
             
             elif choice == '4':
-                return self.select_songs_by_playlist(songs)
+                return self.select_songs_by_playlist(songs, playlist, assume_yes)
             
             elif choice == '5':
                 return self.manual_song_selection(songs)
@@ -237,22 +376,20 @@ class SongCleanupTool:
             else:
                 print("❌ Invalid choice. Please enter 1-6.")
     
-    def search_and_select_songs(self, songs: List[dict]) -> List[dict]:
+    def search_and_select_songs(self, songs: List[dict], search_term: Optional[str] = None,
+                                assume_yes: bool = False) -> List[dict]:
         """Search for songs by name/artist and select for removal"""
-        search_term = input("Enter search term (song name or artist): ").strip().lower()
+        if search_term is None:
+            search_term = input("Enter search term (song name or artist): ")
+        search_term = search_term.strip().lower()
         
         if not search_term:
             print("❌ No search term provided")
             return []
         
-        matching_songs = []
-        for song in songs:
-            if song['metadata']:
-                track_name = song['metadata']['track_name'].lower()
-                artists = song['metadata']['artists_string'].lower()
-                
-                if search_term in track_name or search_term in artists:
-                    matching_songs.append(song)
+        # Names were lowercased once while scanning, not again for every query
+        matching_songs = [song for song in songs
+                          if song['search_text'] is not None and search_term in song['search_text']]
         
         if not matching_songs:
             print(f"❌ No songs found matching '{search_term}'")
@@ -264,58 +401,82 @@ class SongCleanupTool:
             status = "📁" if song['file_exists'] else "❌"
             print(f"   {i}. {status} {metadata['track_name']} by {metadata['artists_string']}")
         
+        if assume_yes:
+            return matching_songs
+        
         confirm = input(f"\nRemove all {len(matching_songs)} matching songs? (y/n): ").strip().lower()
         if confirm in ['y', 'yes']:
             return matching_songs
         else:
             return []
     
-    def select_songs_by_playlist(self, songs: List[dict]) -> List[dict]:
-        """Select songs that belong to specific playlists"""
+    def select_songs_by_playlist(self, songs: List[dict], playlist: Optional[str] = None,
+                                 assume_yes: bool = False) -> List[dict]:
+        """Select songs that belong to specific playlists (playlist: key or name given on the command line)"""
         playlists = self.playlists_db.get('playlists', {})
         
         if not playlists:
             print("❌ No playlists found in database")
             return []
         
-        print(f"\n📋 Available playlists:")
-        playlist_list = list(playlists.keys())
-        for i, playlist_key in enumerate(playlist_list, 1):
-            playlist_info = playlists[playlist_key]
-            print(f"   {i}. {playlist_info['name']} ({playlist_info.get('total_tracks', 0)} tracks)")
-        
-        try:
-            choice = int(input(f"\nSelect playlist (1-{len(playlist_list)}): ").strip())
-            if 1 <= choice <= len(playlist_list):
-                selected_playlist = playlist_list[choice - 1]
-                
-                # Find songs belonging to this playlist
-                playlist_songs = []
-                for song in songs:
-                    if song['metadata'] and selected_playlist in song['metadata'].get('playlists', []):
-                        playlist_songs.append(song)
-                
-                if playlist_songs:
-                    playlist_name = playlists[selected_playlist]['name']
-                    print(f"\n📋 Found {len(playlist_songs)} songs in playlist '{playlist_name}'")
-                    
-                    confirm = input(f"Remove all {len(playlist_songs)} songs from this playlist? (y/n): ").strip().lower()
-                    if confirm in ['y', 'yes']:
-                        return playlist_songs
-                else:
-                    print(f"❌ No songs found for selected playlist")
-            else:
+        if playlist is not None:
+            selected_playlist = self.find_playlist_key(playlist)
+            if selected_playlist is None:
+                print(f"❌ Playlist not found: {playlist}")
+                return []
+        else:
+            print(f"\n📋 Available playlists:")
+            playlist_list = list(playlists.keys())
+            for i, playlist_key in enumerate(playlist_list, 1):
+                playlist_info = playlists[playlist_key]
+                print(f"   {i}. {playlist_info['name']} ({playlist_info.get('total_tracks', 0)} tracks)")
+            
+            try:
+                choice = int(input(f"\nSelect playlist (1-{len(playlist_list)}): ").strip())
+            except ValueError:
+                print("❌ Invalid input")
+                return []
+            if not 1 <= choice <= len(playlist_list):
                 print("❌ Invalid playlist selection")
-        except ValueError:
-            print("❌ Invalid input")
+                return []
+            selected_playlist = playlist_list[choice - 1]
+        
+        # Songs belonging to this playlist (indexed while scanning)
+        playlist_songs = list(self._playlist_index.get(selected_playlist, []))
+        
+        if not playlist_songs:
+            print(f"❌ No songs found for selected playlist")
+            return []
+        
+        playlist_name = playlists[selected_playlist]['name']
+        print(f"\n📋 Found {len(playlist_songs)} songs in playlist '{playlist_name}'")
         
+        if assume_yes:
+            return playlist_songs
+        
+        confirm = input(f"Remove all {len(playlist_songs)} songs from this playlist? (y/n): ").strip().lower()
+        if confirm in ['y', 'yes']:
+            return playlist_songs
         return []
     
+    def find_playlist_key(self, playlist: str) -> Optional[str]:
+        """Resolve a playlist key, or a playlist name (case-insensitive), to its key"""
+        playlists = self.playlists_db.get('playlists', {})
+        if playlist in playlists:
+            return playlist
+        
+        name_lower = playlist.lower()
+        for playlist_key, playlist_info in playlists.items():
+            if playlist_info.get('name', '').lower() == name_lower:
+                return playlist_key
+        return None
+    
     def manual_song_selection(self, songs: List[dict]) -> List[dict]:
         """Manual selection of songs for removal"""
         print(f"\n📜 All Songs (showing first 50):")
         
-        display_songs = songs[:50]
+        # Only the 50 shown need ordering (files first, then by name), not the whole scan
+        display_songs = heapq.nsmallest(50, songs, key=lambda song: (not song['file_exists'], song['filename']))
         for i, song in enumerate(display_songs, 1):
             status = "📁" if song['file_exists'] else "❌"
             db_status = "📚" if song['in_database'] else "⚠️"
@@ -372,52 +533,83 @@ class SongCleanupTool:
         removed_files = 0
         removed_from_db = 0
         updated_playlists = set()
+        now_iso = datetime.now().isoformat()  # One timestamp for everything this removal touches
+        songs_by_playlist = defaultdict(set)  # playlist key -> IDs of removed songs listed in it
+        log_lines = []  # Progress lines, written to stdout in one go
+        
+        # Bind the tables once instead of a .get('...', {}) per song
+        songs_dict = self.songs_db.setdefault('songs', {})
+        mapping_dict = self.mapping_db.setdefault('mapping', {})
+        playlists_dict = self.playlists_db.setdefault('playlists', {})
+        
+        # Remove physical files that exist, all at once; only failures are reported per file
+        files_to_delete = [song for song in songs_to_remove if song['file_exists']]
+        if files_to_delete:
+            errors = None
+            if liburing:
+                errors = remove_files_uring(Config.SONGS_FOLDER, [song['filename'] for song in files_to_delete])
+            if errors is None:
+                with ThreadPoolExecutor(max_workers=Config.DELETE_WORKERS) as executor:
+                    errors = list(executor.map(try_remove_file, [song['file_path'] for song in files_to_delete]))
+            for song, error in zip(files_to_delete, errors):
+                if error:
+                    log_lines.append(f"   ❌ Failed to delete {song['filename']}: {error}")
+                else:
+                    removed_files += 1
+            log_lines.append(f"   🗑️  Deleted {removed_files} files")
         
         for song in songs_to_remove:
             song_id = song['song_id']
             
-            # Remove physical file if it exists
-            if song['file_exists']:
-                try:
-                    os.remove(song['file_path'])
-                    print(f"   🗑️  Deleted file: {song['filename']}")
-                    removed_files += 1
-                except Exception as e:
-                    print(f"   ❌ Failed to delete {song['filename']}: {e}")
-            
             # Remove from songs database
-            if song_id in self.songs_db.get('songs', {}):
-                del self.songs_db['songs'][song_id]
+            if song_id in songs_dict:
+                del songs_dict[song_id]
                 removed_from_db += 1
-                print(f"   📚 Removed from songs database: {song_id}")
+                self._dirty['songs'] = True
+                log_lines.append(f"   📚 Removed from songs database: {song_id}")
             
             # Remove from mapping database
-            if song_id in self.mapping_db.get('mapping', {}):
-                del self.mapping_db['mapping'][song_id]
-                print(f"   🔗 Removed from mapping database: {song_id}")
+            if song_id in mapping_dict:
+                del mapping_dict[song_id]
+                self._dirty['mapping'] = True
+                log_lines.append(f"   🔗 Removed from mapping database: {song_id}")
             
-            # Update playlists to remove this song
+            # Note the playlists to remove this song from
             if song['metadata']:
-                playlists = song['metadata'].get('playlists', [])
-                for playlist_key in playlists:
-                    if playlist_key in self.playlists_db.get('playlists', {}):
-                        playlist_songs = self.playlists_db['playlists'][playlist_key].get('songs', [])
-                        if song_id in playlist_songs:
-                            playlist_songs.remove(song_id)
-                            self.playlists_db['playlists'][playlist_key]['songs'] = playlist_songs
-                            self.playlists_db['playlists'][playlist_key]['total_tracks'] = len(playlist_songs)
-                            self.playlists_db['playlists'][playlist_key]['unique_song_count'] = len(playlist_songs)
-                            self.playlists_db['playlists'][playlist_key]['last_updated'] = datetime.now().isoformat()
-                            updated_playlists.add(playlist_key)
-                            print(f"   📋 Removed from playlist: {playlist_key}")
+                for playlist_key in song['metadata'].get('playlists', []):
+                    songs_by_playlist[playlist_key].add(song_id)
+        
+        # Rebuild each affected playlist's song list once, instead of a list.remove per song
+        for playlist_key, removed_ids in songs_by_playlist.items():
+            if playlist_key not in playlists_dict:
+                continue
+            
+            playlist_info = playlists_dict[playlist_key]
+            playlist_songs = playlist_info.get('songs', [])
+            remaining_songs = [s for s in playlist_songs if s not in removed_ids]
+            if len(remaining_songs) == len(playlist_songs):
+                continue
+            
+            playlist_info['songs'] = remaining_songs
+            playlist_info['total_tracks'] = len(remaining_songs)
+            playlist_info['unique_song_count'] = len(remaining_songs)
+            playlist_info['last_updated'] = now_iso
+            updated_playlists.add(playlist_key)
+            self._dirty['playlists'] = True
+            log_lines.append(f"   📋 Removed {len(playlist_songs) - len(remaining_songs)} songs from playlist: {playlist_key}")
         
         # Update database totals
-        self.songs_db['total_songs'] = len(self.songs_db.get('songs', {}))
-        self.songs_db['last_updated'] = datetime.now().isoformat()
+        if self._dirty['songs']:
+            self.songs_db['total_songs'] = len(songs_dict)
+            self.songs_db['last_updated'] = now_iso
+        
+        if self._dirty['mapping']:
+            self.mapping_db['last_updated'] = now_iso
         
-        self.mapping_db['last_updated'] = datetime.now().isoformat()
+        if self._dirty['playlists']:
+            self.playlists_db['last_updated'] = now_iso
         
-        self.playlists_db['last_updated'] = datetime.now().isoformat()
+        sys.stdout.write(''.join(line + '\n' for line in log_lines))
         
         print(f"\n📊 Removal Summary:")
         print(f"   🗑️  Files deleted: {removed_files}")
@@ -428,31 +620,41 @@ class SongCleanupTool:
         """Save all updated databases"""
         print(f"\n💾 Saving updated databases...")
         
-        success_count = 0
-        
-        if save_json_file(Config.SONGS_DB_FILE, self.songs_db):
-            success_count += 1
-            print("   ✅ Songs database saved")
-        
-        if save_json_file(Config.PLAYLISTS_DB_FILE, self.playlists_db):
-            success_count += 1
-            print("   ✅ Playlists database saved")
-        
-        if save_json_file(Config.MAPPING_DB_FILE, self.mapping_db):
-            success_count += 1
-            print("   ✅ Mapping database saved")
+        saves = [
+            ('songs', Config.SONGS_DB_FILE, "Songs"),
+            ('playlists', Config.PLAYLISTS_DB_FILE, "Playlists"),
+            ('mapping', Config.MAPPING_DB_FILE, "Mapping"),
+            ('artists', Config.ARTISTS_DB_FILE, "Artists"),
+        ]
+        # Only changed databases are touched (so an unused artists database is never loaded)
+        saves = [(name, path, getattr(self, f"{name}_db"), label)
+                 for name, path, label in saves if self._dirty[name]]
+        
+        if not saves:
+            print("   ℹ️  No database changes to save")
+            return
         
-        if save_json_file(Config.ARTISTS_DB_FILE, self.artists_db):
-            success_count += 1
-            print("   ✅ Artists database saved")
+        # The files are independent, so they are written concurrently
+        with ThreadPoolExecutor(max_workers=len(saves)) as executor:
+            results = list(executor.map(lambda save: save_json_file(save[1], save[2], backup=True), saves))
         
-        if success_count == 4:
-            print("💾 All databases saved successfully!")
+        success_count = 0
+        for (name, _, _, label), (saved, backup_name) in zip(saves, results):
+            if backup_name:
+                print(f"📋 Created backup: {backup_name}")
+            if saved:
+                success_count += 1
+                self._dirty[name] = False
+                print(f"   ✅ {label} database saved")
+        
+        if success_count == len(saves):
+            print("💾 All changed databases saved successfully!")
         else:
-            print(f"⚠️  Only {success_count}/4 databases saved successfully")
+            print(f"⚠️  Only {success_count}/{len(saves)} changed databases saved successfully")
     
-    def run_cleanup(self):
-        """Main cleanup process"""
+    def run_cleanup(self, mode: Optional[str] = None, search_term: Optional[str] = None,
+                    playlist: Optional[str] = None, assume_yes: bool = False):
+        """Main cleanup process (mode/search_term/playlist/assume_yes come from the command line)"""
         print("🧹 Song Cleanup Tool")
         print("=" * 50)
         print("This tool will help you remove songs and clean up metadata")
@@ -469,7 +671,7 @@ class SongCleanupTool:
         self.display_songs_summary(songs)
         
         # Select songs for removal
-        songs_to_remove = self.select_songs_for_removal(songs)
+        songs_to_remove = self.select_songs_for_removal(songs, mode, search_term, playlist, assume_yes)
         
         if not songs_to_remove:
             print("✅ No songs selected for removal")
@@ -494,7 +696,10 @@ class SongCleanupTool:
         print(f"   📋 Update affected playlists")
         print(f"   💾 Create backup files before making changes")
         
-        final_confirm = input(f"\nAre you absolutely sure? Type 'DELETE' to confirm: ").strip()
+        if assume_yes:
+            final_confirm = 'DELETE'
+        else:
+            final_confirm = input(f"\nAre you absolutely sure? Type 'DELETE' to confirm: ").strip()
         
         if final_confirm == 'DELETE':
             # Perform removal
@@ -510,8 +715,22 @@ class SongCleanupTool:
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Remove songs and clean up their metadata. "
+                                                 "Without --mode the tool asks interactively.")
+    parser.add_argument('--mode', choices=list(CLI_MODES),
+                        help="removal option to run: missing files, orphaned files, search results or a playlist's songs")
+    parser.add_argument('--search', help="search term (song name or artist) for --mode search")
+    parser.add_argument('--playlist', help="playlist key or name for --mode playlist")
+    parser.add_argument('--yes', action='store_true', help="skip every confirmation prompt")
+    args = parser.parse_args()
+    
+    if args.mode == 'search' and args.search is None and args.yes:
+        parser.error("--mode search with --yes needs --search")
+    if args.mode == 'playlist' and args.playlist is None and args.yes:
+        parser.error("--mode playlist with --yes needs --playlist")
+    
     cleanup_tool = SongCleanupTool()
-    cleanup_tool.run_cleanup()
+    cleanup_tool.run_cleanup(CLI_MODES.get(args.mode), args.search, args.playlist, args.yes)
 
 if __name__ == "__main__":
     main()
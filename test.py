@@ -1,8 +1,14 @@
 import requests
+from concurrent.futures import ThreadPoolExecutor
+
+# One keep-alive session, so repeated lookups reuse the TLS connection
+SESSION = requests.Session()
+REQUEST_TIMEOUT = 5
+MAX_WORKERS = 8
 
 def get_spotify_image_url(track_id):
     url = f"https://open.spotify.com/oembed?url=spotify:track:{track_id}"
-    response = requests.get(url)
+    response = SESSION.get(url, timeout=REQUEST_TIMEOUT)
     
     if response.status_code != 200:
         raise Exception(f"Error: {response.status_code} - {response.text}")
@@ -10,7 +16,21 @@ def get_spotify_image_url(track_id):
     data = response.json()
     return data["thumbnail_url"]
 
+def try_get_spotify_image_url(track_id):
+    """Like get_spotify_image_url, but prints the error and returns None for a failed track"""
+    try:
+        return get_spotify_image_url(track_id)
+    except Exception as e:
+        print(f"❌ {track_id}: {e}")
+        return None
+
+def get_spotify_image_urls(track_ids):
+    """Look up several tracks concurrently over the shared session, returns track ID -> image URL (None if it failed)"""
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        return dict(zip(track_ids, executor.map(try_get_spotify_image_url, track_ids)))
+
 if __name__ == "__main__":
-    track_id = input("Enter Spotify track ID: ").strip()
-    image_url = get_spotify_image_url(track_id)
-    print(f"Image URL: {image_url}")
+    track_ids = [t.strip() for t in input("Enter Spotify track ID(s), comma-separated: ").split(",") if t.strip()]
+    for track_id, image_url in get_spotify_image_urls(track_ids).items():
+        if image_url is not None:
+            print(f"{track_id} -> Image URL: {image_url}")